@@ -0,0 +1,337 @@
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from RussianROULETTED import CARDS, play_seeded_game
+
+# Constant-memory statistics over any number of games:
+#
+#   python aggregate.py --players 4 --workers 8 --win-ci 0.002 --json stats.json
+#
+# Each finished game is folded into a GameAggregator and then dropped, so
+# memory depends on the number of seats and card types, never on the
+# number of games. Aggregators from different shards merge, and merging is
+# associative: counters and the quantile sketch combine exactly, and the
+# running mean and variance combine with Chan's formula, which agrees up to
+# float rounding in any grouping. Shards are still merged in order, so a
+# given seed gives the same output for any number of workers.
+#
+# Without --games the run goes on until the requested confidence intervals
+# are narrow enough, or until interrupted with Ctrl-C, which keeps the games
+# finished so far. Progress (games/sec and current interval widths) is
+# printed every few seconds to help decide when to stop.
+
+Z_95 = 1.959964
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+# -------- Summaries --------
+
+class Welford:
+    # Running count, mean and sum of squared deviations.
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other):
+        count = self.count + other.count
+        if count:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+            self.mean += delta * other.count / count
+            self.count = count
+        return self
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def ci(self):
+        # Half-width of the 95% interval for the mean.
+        return Z_95 * math.sqrt(self.variance() / self.count) if self.count else math.inf
+
+class QuantileSketch:
+    # Relative-error quantile sketch in the style of DDSketch: positive values
+    # are counted in logarithmic buckets of ratio gamma, so any quantile it
+    # returns is within relative_accuracy of a true sample value. Memory grows
+    # with log(max / min) only, and merging adds bucket counts, which is exact
+    # in any order.
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}     # Bucket index -> count; bucket i holds (gamma^(i-1), gamma^i].
+        self.zeros = 0        # Values <= 0.
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value, count=1):
+        self.count += count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zeros += count
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Can't merge sketches with different accuracies")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return self.min
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket in relative terms.
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+def card_ids(mask):
+    # Card IDs set in a Player.played bitmask, lowest first.
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+# -------- Aggregator --------
+
+class GameAggregator:
+    # Everything is counted per player-game (one seat in one game), so a
+    # card's win rate compares directly with 1 / num_players.
+    def __init__(self, num_players, relative_accuracy=0.01):
+        n = len(CARDS.types)
+        self.num_players = num_players
+        self.games = 0
+        self.no_winner = 0
+        self.wins_by_seat = [0] * num_players
+        self.length = Welford()                                 # Rounds per game.
+        self.elimination_rounds = QuantileSketch(relative_accuracy)
+        self.played = [0] * n           # Player-games in which the player played card i.
+        self.played_wins = [0] * n
+        self.held = [0] * n             # Player-games ending with card i in hand.
+        self.held_wins = [0] * n
+        self.co_played = [0] * (n * n)  # [i * n + j], i < j: player played both i and j.
+        self.co_played_wins = [0] * (n * n)
+
+    def add_game(self, game, winner):
+        self.games += 1
+        self.length.add(game.round_count)
+        for round_number in game.elimination_rounds:
+            self.elimination_rounds.add(round_number)
+        if winner is None:
+            self.no_winner += 1
+        else:
+            self.wins_by_seat[winner.seat] += 1
+        n = len(self.played)
+        for p in game.players:
+            won = p is winner
+            ids = card_ids(p.played)
+            for k, i in enumerate(ids):
+                self.played[i] += 1
+                self.played_wins[i] += won
+                for j in ids[k + 1:]:
+                    self.co_played[i * n + j] += 1
+                    self.co_played_wins[i * n + j] += won
+            for i in {card.card_id for card in p.hand}:
+                self.held[i] += 1
+                self.held_wins[i] += won
+
+    def merge(self, other):
+        if other.num_players != self.num_players:
+            raise ValueError("Can't merge aggregates of different table sizes")
+        self.games += other.games
+        self.no_winner += other.no_winner
+        for name in ("wins_by_seat", "played", "played_wins", "held", "held_wins",
+                     "co_played", "co_played_wins"):
+            setattr(self, name, [a + b for a, b in zip(getattr(self, name), getattr(other, name))])
+        self.length.merge(other.length)
+        self.elimination_rounds.merge(other.elimination_rounds)
+        return self
+
+    def win_rate(self, seat=0):
+        # (rate, half-width of its 95% interval).
+        if not self.games:
+            return 0.0, math.inf
+        rate = self.wins_by_seat[seat] / self.games
+        return rate, Z_95 * math.sqrt(rate * (1 - rate) / self.games)
+
+    def as_dict(self, min_pair_games=100):
+        # Plain summary; card pairs seen in fewer than min_pair_games
+        # player-games are left out.
+        n = len(self.played)
+        names = [card_type.name for card_type in CARDS.types]
+        cards = {}
+        for i, name in enumerate(names):
+            cards[name] = {
+                "played": self.played[i],
+                "played_win_rate": self.played_wins[i] / self.played[i] if self.played[i] else None,
+                "held": self.held[i],
+                "held_win_rate": self.held_wins[i] / self.held[i] if self.held[i] else None,
+            }
+        pairs = []
+        for i in range(n):
+            for j in range(i + 1, n):
+                count = self.co_played[i * n + j]
+                if count >= min_pair_games:
+                    pairs.append({"cards": [names[i], names[j]], "played": count,
+                                  "win_rate": self.co_played_wins[i * n + j] / count})
+        pairs.sort(key=lambda pair: -pair["win_rate"])
+        return {
+            "games": self.games,
+            "wins_by_seat": list(self.wins_by_seat),
+            "no_winner": self.no_winner,
+            "rounds": {"mean": self.length.mean, "stdev": math.sqrt(self.length.variance()),
+                       "ci95": self.length.ci()},
+            "elimination_round_quantiles": {f"p{round(q * 100)}": self.elimination_rounds.quantile(q)
+                                            for q in QUANTILES},
+            "cards": cards,
+            "co_played": pairs,
+        }
+
+# -------- Running --------
+
+def aggregate_shard(seed, start, stop, num_players=4, max_rounds=10000):
+    # Games [start, stop) of a run, the same games as run_simulation plays.
+    # Top-level so worker processes can pickle it.
+    aggregator = GameAggregator(num_players)
+    for game_index in range(start, stop):
+        game, winner = play_seeded_game(seed, game_index, num_players, max_rounds)
+        aggregator.add_game(game, winner)
+    return aggregator
+
+class Progress:
+    # Prints throughput and interval widths at most every `interval` seconds.
+    def __init__(self, interval=2.0, say=print):
+        self.interval = interval
+        self.say = say
+        self.start = self.last = time.perf_counter()
+
+    def update(self, aggregator, force=False):
+        now = time.perf_counter()
+        if not force and now - self.last < self.interval:
+            return
+        self.last = now
+        elapsed = now - self.start
+        rate, rate_ci = aggregator.win_rate()
+        self.say(f"{aggregator.games:>10} games  {aggregator.games / elapsed if elapsed else 0:8.0f} games/sec  "
+                 f"rounds {aggregator.length.mean:.3f} ±{aggregator.length.ci():.3f}  "
+                 f"seat 1 wins {rate:.2%} ±{rate_ci:.2%}")
+
+def run_aggregate(n_games=None, seed=0, num_players=4, max_rounds=10000, workers=1, shard_size=1000,
+                  stop=None, progress=None):
+    # Plays shards until n_games are done or stop(aggregator) is true, keeping
+    # two shards per worker in flight. Returns (aggregator, interrupted).
+    aggregator = GameAggregator(num_players)
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    pending = []
+    next_start = 0
+    interrupted = False
+    try:
+        while True:
+            while len(pending) < 2 * workers and (n_games is None or next_start < n_games):
+                end = next_start + shard_size if n_games is None else min(next_start + shard_size, n_games)
+                args = (seed, next_start, end, num_players, max_rounds)
+                pending.append(aggregate_shard(*args) if pool is None else pool.submit(aggregate_shard, *args))
+                next_start = end
+            if not pending:
+                break
+            shard = pending.pop(0)
+            aggregator.merge(shard if pool is None else shard.result())
+            if progress is not None:
+                progress.update(aggregator)
+            if stop is not None and stop(aggregator):
+                break
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    if progress is not None:
+        progress.update(aggregator, force=True)
+    return aggregator, interrupted
+
+# -------- Main --------
+
+def print_summary(aggregator, say=print):
+    summary = aggregator.as_dict()
+    rounds = summary["rounds"]
+    say(f"Rounds per game: {rounds['mean']:.3f} ±{rounds['ci95']:.3f} (sd {rounds['stdev']:.2f})")
+    say("Elimination round quantiles: " + ", ".join(
+        f"{name} {value:.1f}" for name, value in summary["elimination_round_quantiles"].items()))
+    say(f"Wins by seat: {summary['wins_by_seat']}  (no winner: {summary['no_winner']})")
+    say(f"{'card':52} {'played':>9} {'win rate':>9} {'held':>9} {'win rate':>9}")
+    for name, card in summary["cards"].items():
+        played_rate = card["played_win_rate"]
+        held_rate = card["held_win_rate"]
+        say(f"{name:52} {card['played']:9} {'' if played_rate is None else f'{played_rate:.1%}':>9} "
+            f"{card['held']:9} {'' if held_rate is None else f'{held_rate:.1%}':>9}")
+    for label, pairs in (("Best", summary["co_played"][:5]), ("Worst", summary["co_played"][-5:][::-1])):
+        say(f"{label} cards to have played together:")
+        for pair in pairs:
+            say(f"  {pair['win_rate']:.1%} over {pair['played']:>8}  {' + '.join(pair['cards'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming, constant-memory statistics over bot games.")
+    parser.add_argument("--games", type=int, help="stop after this many games (default: no limit)")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-rounds", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--rounds-ci", type=float, metavar="R",
+                        help="stop once mean rounds per game is known to ±R")
+    parser.add_argument("--win-ci", type=float, metavar="P",
+                        help="stop once seat 1's win rate is known to ±P (e.g. 0.005)")
+    parser.add_argument("--every", type=float, default=2.0, metavar="SECONDS", help="progress interval")
+    parser.add_argument("--json", metavar="PATH", help="write the full summary here")
+    args = parser.parse_args()
+    if args.games is None and args.rounds_ci is None and args.win_ci is None:
+        print("No --games, --rounds-ci or --win-ci given: running until Ctrl-C")
+
+    def converged(aggregator):
+        if args.rounds_ci is not None and aggregator.length.ci() > args.rounds_ci:
+            return False
+        if args.win_ci is not None and aggregator.win_rate()[1] > args.win_ci:
+            return False
+        return args.rounds_ci is not None or args.win_ci is not None
+
+    aggregator, interrupted = run_aggregate(args.games, args.seed, args.players, args.max_rounds,
+                                            args.workers or os.cpu_count(), args.shard_size,
+                                            converged, Progress(args.every))
+    if interrupted:
+        print("Interrupted; summarizing the games finished so far")
+    print_summary(aggregator)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(aggregator.as_dict(), f, indent=1, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
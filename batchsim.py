@@ -0,0 +1,278 @@
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from RussianROULETTED import CARDS, Deck, Game, NullPresenter
+
+# Vectorised simulator for the pure-revolver core of the game: a deck made
+# only of the cards that act on the revolver ("Respin", "Just 1 more",
+# "Bullets!!!", "Get that out of here", "Peek’ n see"). N games are held as
+# NumPy arrays and every turn advances all unfinished games at once.
+#
+# Both engines play the same policy: on their turn a player plays a uniformly
+# random card from hand with probability p_play, otherwise plays nothing,
+# then pulls the trigger. Turn order, deck refills and hand refills follow
+# Game.play exactly, so outcome distributions can be compared directly
+# (see cross_check).
+
+CORE_CARDS = ["Respin", "Just 1 more", "Bullets!!!", "Get that out of here", "Peek’ n see"]
+RESPIN, JUST_1_MORE, BULLETS, GET_THAT_OUT, PEEK = range(len(CORE_CARDS))
+HAND_SIZE = 4
+
+class BatchResult:
+    def __init__(self, winners, rounds, num_players):
+        self.winners = winners    # Winning seat per game, -1 if the round cap hit.
+        self.rounds = rounds      # Rounds played per game.
+        self.num_players = num_players
+
+    def wins_by_seat(self):
+        return np.bincount(self.winners[self.winners >= 0], minlength=self.num_players)
+
+# -------- Batch Engine --------
+
+class BatchRevolverSim:
+    # Per-game state lives in arrays: chamber and alive bitmasks (bit i set =
+    # chamber i loaded / seat i alive), a current-chamber vector, each game's
+    # shuffled draw pile with a read position, and a hand matrix of card types
+    # per (game, seat, slot). Hands are always full at the start of a turn in
+    # this subset of the game, so playing a random card is picking a random slot.
+    def __init__(self, n_games, num_players=4, num_chambers=6, copies=4, p_play=0.5,
+                 max_rounds=10000, seed=None):
+        self.n = n_games
+        self.num_players = num_players
+        self.num_chambers = num_chambers
+        self.p_play = p_play
+        self.max_rounds = max_rounds
+        self.rng = np.random.default_rng(seed)
+        self.template = np.repeat(np.arange(len(CORE_CARDS), dtype=np.uint8), copies)
+        self.card_mask = (1 << (len(CORE_CARDS) - 1).bit_length()) - 1
+
+    def _shuffle_decks(self, games):
+        # Fresh, independently shuffled pile for each game in `games`: each
+        # card rides in the low bits of a random key, so sorting the keys in
+        # place shuffles the pile without an argsort and a gather.
+        keys = self.rng.integers(0, 1 << 32, (len(games), len(self.template)), dtype=np.uint32)
+        keys &= np.uint32(~self.card_mask & 0xFFFFFFFF)
+        keys |= self.template
+        keys.sort(axis=1)
+        self.deck[games] = keys & self.card_mask
+        self.deck_pos[games] = 0
+
+    def _draw(self, games):
+        # Next card of each game's pile, reshuffling piles that ran out.
+        pos = self.deck_pos[games]
+        empty = pos == len(self.template)
+        if empty.any():
+            self._shuffle_decks(games[empty])
+            pos[empty] = 0
+        self.deck_pos[games] = pos + 1
+        return self.deck[games, pos]
+
+    def _bits_of_rank(self, bits, rank):
+        # The rank-th lowest set bit of each mask (from 0), or 0 where a mask
+        # has no more than rank bits set: the chamber whose running count of
+        # set bits reaches rank + 1.
+        one = self.word(1)
+        loaded = (bits[:, None] >> self.chamber_shifts) & one
+        hit = (loaded.cumsum(axis=1, dtype=self.word) == rank[:, None] + 1) & (loaded == one)
+        return (hit.astype(self.word) << self.chamber_shifts).sum(axis=1, dtype=self.word)
+
+    def _random_bits(self, bits):
+        # One uniformly chosen set bit of each mask (0 where a mask is empty):
+        # pick a rank, like Revolver does, and look its bit up.
+        rank = (self.rng.random(len(bits)) * np.bitwise_count(bits)).astype(self.word)
+        if self.bit_table is not None:
+            return self.bit_table[bits, rank]
+        return self._bits_of_rank(bits, rank)
+
+    def _add_bullets(self, games):
+        self.chambers[games] |= self._random_bits(~self.chambers[games] & self.all_chambers)
+
+    def _remove_bullets(self, games):
+        self.chambers[games] &= ~self._random_bits(self.chambers[games])
+
+    def _next_seat(self, seats):
+        # Seat of the first alive player after `seats`, read off the alive
+        # bitmask rotated so the seat after `seats` is bit 0.
+        P = self.num_players
+        shift = seats + self.word(1)
+        rotated = ((self.alive >> shift) | (self.alive << (self.word(P) - shift))) & self.all_alive
+        offset = np.bitwise_count((rotated & -rotated) - self.word(1))
+        return (shift + offset) % self.word(P)
+
+    def _compact(self, keep):
+        # Drops finished games so later turns work on fewer, contiguous rows.
+        for name in ("ids", "live", "chambers", "current", "alive", "seat",
+                     "deck", "deck_pos", "hands"):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def run(self):
+        n, P, C = self.n, self.num_players, self.num_chambers
+        if P > 63 or C > 63:
+            raise ValueError("The batch engine supports at most 63 players and 63 chambers")
+        rng = self.rng
+        # Masks, seats and chambers live in the narrowest unsigned type with a
+        # bit per seat and per chamber to spare; every turn streams these
+        # arrays, so a byte per game instead of eight saves real time.
+        word = self.word = next(t for t in (np.uint8, np.uint16, np.uint32, np.uint64)
+                                if np.iinfo(t).bits >= max(P, C) + 1)
+        one = word(1)
+        # Rows of every state array are games; ids maps a row back to its game
+        # number and live marks rows still playing. Finished rows are dropped
+        # in bulk once enough of them pile up.
+        self.ids = np.arange(n)
+        self.live = np.ones(n, dtype=bool)
+        self.all_chambers = word((1 << C) - 1)
+        self.chamber_shifts = np.arange(C, dtype=word)
+        # Small revolvers get every (mask, rank) answer worked out up front.
+        self.bit_table = None
+        if C <= 12:
+            masks = np.arange(1 << C)
+            self.bit_table = np.stack([self._bits_of_rank(masks.astype(word), np.full(len(masks), r, word))
+                                       for r in range(C)], axis=1)
+        # Bit i = chamber i loaded.
+        self.chambers = one << rng.integers(0, C, n, dtype=word)
+        self.current = rng.integers(0, C, n, dtype=word)
+        self.all_alive = word((1 << P) - 1)
+        self.alive = np.full(n, self.all_alive, dtype=word)   # Bit i = seat i alive.
+        self.seat = np.zeros(n, dtype=word)
+        self.deck = np.empty((n, len(self.template)), dtype=np.uint8)
+        self.deck_pos = np.zeros(n, dtype=np.min_scalar_type(len(self.template)))
+        self.hands = np.empty((n, P, HAND_SIZE), dtype=np.uint8)
+        winners = np.full(n, -1, dtype=np.int64)
+        rounds = np.zeros(n, dtype=np.int64)
+        self._shuffle_decks(self.ids)
+        if P * HAND_SIZE <= len(self.template):
+            # Dealing seat by seat from a fresh pile is its first P * HAND_SIZE cards.
+            self.hands[:] = self.deck[:, :P * HAND_SIZE].reshape(n, P, HAND_SIZE)
+            self.deck_pos[:] = P * HAND_SIZE
+        else:
+            for seat in range(P):
+                for slot in range(HAND_SIZE):
+                    self.hands[:, seat, slot] = self._draw(self.ids)
+
+        round_count = 0
+        live_count = n
+        while live_count:
+            # Every unfinished game plays exactly one turn per pass.
+            round_count += 1
+            m = len(self.ids)
+            # --- Card play ---
+            pr = np.flatnonzero(self.live & (rng.random(m, dtype=np.float32) < self.p_play))
+            # The played slot as one flat index into hands rather than a
+            # (game, seat, slot) triple.
+            held = (pr * P + self.seat[pr]) * HAND_SIZE + rng.integers(0, HAND_SIZE, len(pr))
+            hands = self.hands.reshape(-1)
+            card = hands[held]
+            respin = pr[card == RESPIN]
+            self.current[respin] = rng.integers(0, C, len(respin), dtype=word)
+            self._add_bullets(pr[(card == JUST_1_MORE) | (card == BULLETS)])
+            self._add_bullets(pr[card == BULLETS])
+            self._remove_bullets(pr[card == GET_THAT_OUT])
+            # --- Trigger pull ---
+            fired = ((self.chambers >> self.current) & one).astype(bool) & self.live
+            self.current += one
+            self.current %= word(C)
+            self.alive &= ~(fired.astype(word) << self.seat)
+            # Survivors refill the card they played.
+            kept = ~fired[pr]
+            hands[held[kept]] = self._draw(pr[kept])
+            # --- Finish or advance ---
+            won = self.live & (np.bitwise_count(self.alive) <= 1)
+            if round_count >= self.max_rounds:
+                rounds[self.ids[self.live]] = round_count
+                won_rows = np.flatnonzero(won)
+            else:
+                self.seat = self._next_seat(self.seat)
+                won_rows = np.flatnonzero(won)
+                rounds[self.ids[won_rows]] = round_count
+            if len(won_rows):
+                last = self.alive[won_rows]
+                winners[self.ids[won_rows]] = np.bitwise_count((last & -last) - one)
+                self.live[won_rows] = False
+                live_count -= len(won_rows)
+                if live_count * 2 < m:
+                    self._compact(self.live)
+            if round_count >= self.max_rounds:
+                break
+        return BatchResult(winners, rounds, P)
+
+# -------- Scalar Reference --------
+
+class CorePolicyDecider:
+    # The batch engine's policy for a scalar Game.
+    def __init__(self, p_play, rng):
+        self.p_play = p_play
+        self.rng = rng
+
+    def choose_action(self, game, player):
+        return 'p' if player.hand and self.rng.random() < self.p_play else 'n'
+
+    def choose_card(self, game, player):
+        return self.rng.randrange(len(player.hand))
+
+def run_scalar(n_games, num_players=4, num_chambers=6, copies=4, p_play=0.5,
+               max_rounds=10000, seed=None):
+    # The same experiment on the object engine, one Game at a time.
+    rng = random.Random(seed)
+    template = CARDS.template({name: copies for name in CORE_CARDS})
+    names = [f"Bot {i + 1}" for i in range(num_players)]
+    winners = np.full(n_games, -1, dtype=np.int64)
+    rounds = np.zeros(n_games, dtype=np.int64)
+    presenter = NullPresenter()
+    for i in range(n_games):
+        game = Game(names, [CorePolicyDecider(p_play, rng) for _ in names], presenter, rng,
+                    deck=Deck(rng, template), num_chambers=num_chambers, hand_size=HAND_SIZE)
+        winner = game.play(max_rounds)
+        rounds[i] = game.round_count
+        if winner is not None:
+            winners[i] = winner.seat
+    return BatchResult(winners, rounds, num_players)
+
+def cross_check(n_games=20000, num_players=4, num_chambers=6, p_play=0.5, seed=0, z_limit=4.0):
+    # Plays both engines and compares win rate by seat and mean game length
+    # with two-sample z-tests. Returns (passed, [(metric, batch, scalar, z)]).
+    batch = BatchRevolverSim(n_games, num_players, num_chambers, p_play=p_play, seed=seed).run()
+    scalar = run_scalar(n_games, num_players, num_chambers, p_play=p_play, seed=seed)
+    rows = []
+    for seat, (wb, ws) in enumerate(zip(batch.wins_by_seat(), scalar.wins_by_seat())):
+        pb, ps = wb / n_games, ws / n_games
+        pooled = (wb + ws) / (2 * n_games)
+        se = math.sqrt(max(pooled * (1 - pooled) * 2 / n_games, 1e-12))
+        rows.append((f"P(seat {seat} wins)", pb, ps, (pb - ps) / se))
+    mb, ms = batch.rounds.mean(), scalar.rounds.mean()
+    se = math.sqrt(batch.rounds.var() / n_games + scalar.rounds.var() / n_games) or 1e-12
+    rows.append(("mean rounds", mb, ms, (mb - ms) / se))
+    return all(abs(z) < z_limit for *_, z in rows), rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorised pure-revolver batch simulator.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--chambers", type=int, default=6)
+    parser.add_argument("--p-play", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", type=int, metavar="N", help="cross-check N games against Game")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = BatchRevolverSim(args.games, args.players, args.chambers, p_play=args.p_play,
+                              seed=args.seed).run()
+    batch_rate = args.games / (time.perf_counter() - start)
+    print(f"Batch: {batch_rate:,.0f} games/sec; wins by seat {result.wins_by_seat().tolist()}, "
+          f"mean rounds {result.rounds.mean():.2f}")
+    if args.check:
+        start = time.perf_counter()
+        run_scalar(min(args.check, 2000), args.players, args.chambers, p_play=args.p_play, seed=args.seed)
+        scalar_rate = min(args.check, 2000) / (time.perf_counter() - start)
+        print(f"Scalar: {scalar_rate:,.0f} games/sec ({batch_rate / scalar_rate:.0f}x)")
+        passed, rows = cross_check(args.check, args.players, args.chambers, args.p_play, args.seed)
+        for metric, b, s, z in rows:
+            print(f"  {metric:18} batch {b:.4f}  scalar {s:.4f}  z {z:+.2f}")
+        print("Distributions match." if passed else "MISMATCH between batch and scalar engines!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from RussianROULETTED import (
+    CARDS, BulkRandom, Deck, Game, NullPresenter, RandomDecider, Revolver, game_seed,
+    play_seeded_game,
+)
+
+# Microbenchmarks for each subsystem of the engine, recorded per commit:
+#
+#   python bench.py run                  run everything, append to benchmarks.json
+#   python bench.py run --only deck,game --quick
+#   python bench.py compare [BASE [HEAD]] --threshold 0.1
+#
+# Results are keyed by `git rev-parse --short HEAD` (with "-dirty" for
+# uncommitted changes). Rates are the best of several repeats, since noise
+# only ever makes a run slower. Memory figures come from tracemalloc and are
+# deterministic for a given seed. compare exits with status 1 when any metric
+# got worse by more than the threshold, so it can gate a CI job.
+
+RESULTS_PATH = "benchmarks.json"
+CHAMBER_COUNTS = (6, 16, 64)
+PLAYER_COUNTS = (2, 6, 32)
+
+# Higher is better for rates, lower is better for everything else.
+HIGHER_IS_BETTER = {"ops/s": True, "games/s": True, "bytes": False}
+
+BENCHMARKS = {}   # Group name -> function(scale, seed) yielding (metric, value, unit).
+
+def benchmark(group):
+    # Decorator: @benchmark("deck") above a generator of results.
+    def decorator(fn):
+        BENCHMARKS[group] = fn
+        return fn
+    return decorator
+
+def best_rate(run, ops, repeat=5):
+    # Operations per second of the fastest of `repeat` calls to run(), each of
+    # which performs `ops` operations.
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return ops / best if best > 0 else float("inf")
+
+# -------- Deck --------
+
+@benchmark("deck")
+def bench_deck(scale, seed):
+    deck = Deck(random.Random(seed))
+    ops = int(20000 * scale)
+
+    def populate():
+        for _ in range(ops):
+            deck.populate_deck()
+    yield "deck.populate_deck", best_rate(populate, ops), "ops/s"
+
+    for n in (1, 4):
+        def draw():
+            for _ in range(ops):
+                deck.draw(n)
+        yield f"deck.draw[{n}]", best_rate(draw, ops), "ops/s"
+
+# -------- Revolver --------
+
+@benchmark("revolver")
+def bench_revolver(scale, seed):
+    rng = random.Random(seed)
+    for chambers in CHAMBER_COUNTS:
+        revolver = Revolver(chambers, rng)
+        fills = max(1, int(50000 * scale) // chambers)
+
+        def add():
+            # Reload from one bullet to full, over and over.
+            for _ in range(fills):
+                revolver.mask, revolver.loaded = 1, 1
+                for _ in range(chambers - 1):
+                    revolver.add_bullet()
+        yield f"revolver.add_bullet[{chambers}]", best_rate(add, fills * (chambers - 1)), "ops/s"
+
+        def remove():
+            # Empty a full cylinder, over and over.
+            for _ in range(fills):
+                revolver.mask, revolver.loaded = revolver.full_mask, chambers
+                for _ in range(chambers):
+                    revolver.remove_bullet()
+        yield f"revolver.remove_bullet[{chambers}]", best_rate(remove, fills * chambers), "ops/s"
+
+        revolver.mask, revolver.loaded = 1, 1
+        pulls = int(100000 * scale)
+
+        def pull():
+            for _ in range(pulls):
+                revolver.pull_trigger()
+        yield f"revolver.pull_trigger[{chambers}]", best_rate(pull, pulls), "ops/s"
+
+# -------- Card Effects --------
+
+def fresh_games(count, seed, num_players=4):
+    # Freshly dealt headless games for effects that consume their state.
+    games = []
+    for i in range(count):
+        rng = random.Random(game_seed(seed, i))
+        names = [f"Bot {j + 1}" for j in range(num_players)]
+        game = Game(names, [RandomDecider(rng) for _ in names], NullPresenter(), rng)
+        game.round_count = 1
+        # Gives "Anotha’ time" something to replicate.
+        game.last_card_played = CARDS.card("Respin")
+        games.append(game)
+    return games
+
+@benchmark("card")
+def bench_cards(scale, seed):
+    # Game.apply_card_effect for every registered card, played by seat 0 of a
+    # fresh game each time. Dealing the games is left out of the timing.
+    ops = max(1, int(1000 * scale))
+    for card in CARDS.cards:
+        best = float("inf")
+        for repeat in range(3):
+            games = fresh_games(ops, seed + repeat)
+            start = time.perf_counter()
+            for game in games:
+                game.apply_card_effect(card, game.players[0])
+            best = min(best, time.perf_counter() - start)
+        yield f"apply_card_effect[{card.name}]", ops / best, "ops/s"
+
+# -------- Full Games --------
+
+@benchmark("game")
+def bench_games(scale, seed):
+    for num_players in PLAYER_COUNTS:
+        n_games = max(1, int(4000 * scale) // num_players)
+
+        def play():
+            for i in range(n_games):
+                play_seeded_game(seed, i, num_players)
+        yield f"game[{num_players}p]", best_rate(play, n_games, repeat=3), "games/s"
+
+@benchmark("snapshot")
+def bench_snapshot(scale, seed):
+    # Game.snapshot/restore/clone on a 4-player game a few rounds in.
+    game = fresh_games(1, seed)[0]
+    game.play(5)
+    snapshot = game.snapshot()
+    ops = int(20000 * scale)
+    for name, fn in (("snapshot", game.snapshot), ("restore", lambda: game.restore(snapshot)),
+                     ("clone", game.clone)):
+        def run():
+            for _ in range(ops):
+                fn()
+        yield f"game.{name}", best_rate(run, ops), "ops/s"
+
+@benchmark("checkpoint")
+def bench_checkpoint(scale, seed):
+    # checkpoint.dumps/loads of the same 4-player game as "snapshot".
+    import checkpoint
+    game = fresh_games(1, seed)[0]
+    game.play(5)
+    data = checkpoint.dumps(game)
+    ops = int(20000 * scale)
+    for name, fn in (("dumps", lambda: checkpoint.dumps(game)), ("loads", lambda: checkpoint.loads(data))):
+        def run():
+            for _ in range(ops):
+                fn()
+        yield f"checkpoint.{name}", best_rate(run, ops), "ops/s"
+    yield "checkpoint.size[4p]", len(data), "bytes"
+
+@benchmark("rng")
+def bench_rng(scale, seed):
+    # BulkRandom against random.Random: the calls the game makes (shuffling a
+    # full deck, a die roll, a pick), then whole 4-player games on each.
+    ops = int(20000 * scale)
+    order = Deck(random.Random(seed)).order
+    for label, cls in (("mt", random.Random), ("bulk", BulkRandom)):
+        rng = cls(seed)
+        calls = (("shuffle", lambda: rng.shuffle(order)), ("randrange", lambda: rng.randrange(6)),
+                 ("choice", lambda: rng.choice(order)))
+        for name, fn in calls:
+            def run():
+                for _ in range(ops):
+                    fn()
+            yield f"rng.{name}[{label}]", best_rate(run, ops), "ops/s"
+    n_games = max(1, int(1000 * scale))
+    for label, cls in (("mt", random.Random), ("bulk", BulkRandom)):
+        def play():
+            for i in range(n_games):
+                play_seeded_game(seed, i, 4, rng_class=cls)
+        yield f"rng.game[4p,{label}]", best_rate(play, n_games, repeat=3), "games/s"
+
+@benchmark("instrument")
+def bench_instrument(scale, seed):
+    # Full 6-player games with instrumentation never enabled, enabled, and
+    # enabled then disabled again. The first and last should match: disabling
+    # restores the original methods.
+    from instrument import Instrumentation
+    n_games = max(1, int(4000 * scale) // 6)
+
+    def play():
+        for i in range(n_games):
+            play_seeded_game(seed, i, 6)
+    off = best_rate(play, n_games, repeat=3)
+    with Instrumentation():
+        on = best_rate(play, n_games, repeat=3)
+    disabled = best_rate(play, n_games, repeat=3)
+    yield "instrument.off[6p]", off, "games/s"
+    yield "instrument.on[6p]", on, "games/s"
+    yield "instrument.disabled[6p]", disabled, "games/s"
+
+@benchmark("memory")
+def bench_memory(scale, seed):
+    # Bytes a freshly dealt Game keeps alive, and the peak allocated while
+    # dealing and playing one to the end (median over several seeds).
+    samples = max(1, int(5 * scale))
+    for num_players in PLAYER_COUNTS:
+        retained, peaks = [], []
+        for i in range(samples):
+            rng = random.Random(game_seed(seed, i))
+            names = [f"Bot {j + 1}" for j in range(num_players)]
+            deciders = [RandomDecider(rng) for _ in names]
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            game = Game(names, deciders, NullPresenter(), rng)
+            retained.append(tracemalloc.get_traced_memory()[0] - base)
+            game.play(10000)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            tracemalloc.stop()
+            del game
+        yield f"game.memory[{num_players}p]", sorted(retained)[len(retained) // 2], "bytes"
+        yield f"game.peak_memory[{num_players}p]", sorted(peaks)[len(peaks) // 2], "bytes"
+
+# -------- Results File --------
+
+def current_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + "-dirty" if dirty else commit
+
+def load_results(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_results(path, results):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(results, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def run_benchmarks(groups=None, scale=1, seed=0, say=print):
+    # Returns {metric: {"value": ..., "unit": ...}} for the chosen groups.
+    metrics = {}
+    for group, fn in BENCHMARKS.items():
+        if groups and group not in groups:
+            continue
+        for metric, value, unit in fn(scale, seed):
+            metrics[metric] = {"value": value, "unit": unit}
+            say(f"  {metric:60} {value:>14,.0f} {unit}")
+    return metrics
+
+def compare(base, head, threshold):
+    # Rows of (metric, base value, head value, relative change, regressed)
+    # for metrics present in both runs. A positive change is an improvement.
+    rows = []
+    for metric, new in head["metrics"].items():
+        old = base["metrics"].get(metric)
+        if old is None or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / old["value"]
+        if not HIGHER_IS_BETTER[new["unit"]]:
+            change = -change
+        rows.append((metric, old["value"], new["value"], change, change < -threshold))
+    return rows
+
+# -------- Main --------
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Engine benchmarks with per-commit regression tracking.")
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSON file of results by commit")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="run benchmarks and record them under the current commit")
+    run.add_argument("--only", help=f"comma-separated groups out of: {', '.join(BENCHMARKS)}")
+    run.add_argument("--quick", action="store_true", help="fewer iterations, noisier numbers")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--label", help="record under this key instead of the commit")
+    cmp = sub.add_parser("compare", help="flag regressions between two recorded runs")
+    cmp.add_argument("base", nargs="?", help="defaults to the second newest run")
+    cmp.add_argument("head", nargs="?", help="defaults to the newest run")
+    cmp.add_argument("--threshold", type=float, default=0.10, help="relative slowdown to flag")
+    cmp.add_argument("--all", action="store_true", help="list unchanged metrics too")
+    args = parser.parse_args(argv)
+    results = load_results(args.results)
+
+    if args.command == "run":
+        groups = set(args.only.split(",")) if args.only else None
+        unknown = (groups or set()) - set(BENCHMARKS)
+        if unknown:
+            parser.error(f"unknown benchmark groups: {', '.join(sorted(unknown))}")
+        key = args.label or current_commit()
+        print(f"Benchmarking {key}")
+        metrics = run_benchmarks(groups, 1 if not args.quick else 0.1, args.seed)
+        # A partial run updates only the metrics it measured.
+        entry = results.pop(key, {"metrics": {}})
+        entry["metrics"].update(metrics)
+        entry["time"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        entry["python"] = platform.python_version()
+        entry["machine"] = platform.machine()
+        results[key] = entry
+        save_results(args.results, results)
+        print(f"Saved to {args.results} under {key}")
+        return 0
+
+    keys = list(results)
+    if len(keys) < 2 and not (args.base and args.head):
+        print(f"Need two recorded runs in {args.results} to compare")
+        return 2
+    base = args.base or keys[-2]
+    head = args.head or keys[-1]
+    for key in (base, head):
+        if key not in results:
+            print(f"No run recorded for {key}")
+            return 2
+    rows = compare(results[base], results[head], args.threshold)
+    print(f"{base} -> {head} (regression threshold {args.threshold:.0%})")
+    regressions = 0
+    for metric, old, new, change, regressed in rows:
+        regressions += regressed
+        if regressed or args.all or abs(change) > args.threshold:
+            flag = "REGRESSION" if regressed else ("better" if change > 0 else "")
+            print(f"  {metric:60} {old:>14,.0f} -> {new:>14,.0f}  {change:+7.1%}  {flag}")
+    print(f"{len(rows)} metrics compared, {regressions} regressed")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,250 @@
+import os
+import struct
+import zlib
+from array import array
+
+from RussianROULETTED import CARDS, Game, GameSnapshot, NullPresenter
+
+# Compact, versioned binary checkpoints of a whole Game, so a server can
+# resume its tables after a crash. Little-endian throughout:
+#
+#   header    "RRCK", format version, player count, chamber count, current
+#             chamber, seat to play next, reversed flag, last card played
+#             (255 = none), round count, deck position, deck length, custom
+#             deck template length (0 = standard deck)
+#   mask      loaded-chamber bitmask, one bit per chamber rounded up to
+#             whole bytes
+#   template  card IDs of a custom deck's template, if any
+#   deck      card IDs of the draw pile (the position marks the next card)
+#   players   per seat: effect fields, hand size, name length, hand card
+#             IDs, UTF-8 name, then a length-prefixed bitmask of the card
+#             IDs they have played
+#   order     the TurnOrder ring (successor and predecessor of every seat)
+#             and the active seats in targeting order
+#   history   eliminated seats and the round of each elimination, then how
+#             many times each card ID was played
+#   hand size cards each hand is refilled to
+#   crc32     of everything before it
+#
+# A 4-player table takes a few hundred bytes, mostly the draw pile. The
+# game's RNG is not saved: a restored game continues with whichever RNG it
+# is given, so it plays on from the same position but doesn't replay the
+# same future.
+
+MAGIC = b"RRCK"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHHHBBIHHH")
+MAX_CHAMBERS = 0xFFFF
+PLAYER = struct.Struct("<BBhBBBBH")
+COUNT = struct.Struct("<H")
+CRC = struct.Struct("<I")
+NO_CARD = 255
+
+# -------- Encoding --------
+
+def dumps(game):
+    # Raises ValueError for a game too big for the format's fields.
+    order = game.turn_order
+    deck = game.deck
+    revolver = game.revolver
+    last = game.last_card_played
+    custom = deck.template if deck.template is not CARDS.deck_template else b""
+    n = len(game.players)
+    if revolver.num_chambers > MAX_CHAMBERS:
+        raise ValueError(f"Checkpoints hold at most {MAX_CHAMBERS} chambers")
+    if n > 0xFFFF or max(len(deck.order), len(custom)) > 0xFFFF:
+        raise ValueError("Checkpoints hold at most 65535 players and 65535-card decks")
+    if not 0 <= game.hand_size <= 255 or game.round_count > 0xFFFFFFFF:
+        raise ValueError("Checkpoints hold hand sizes up to 255 and round counts up to 2**32 - 1")
+    parts = [
+        HEADER.pack(MAGIC, VERSION, n, revolver.num_chambers, revolver.current_chamber,
+                    order.current, order.reversed,
+                    NO_CARD if last is None else last.card_id, game.round_count,
+                    deck.position, len(deck.order), len(custom)),
+        revolver.mask.to_bytes((revolver.num_chambers + 7) // 8, "little"),
+        bytes(custom),
+        bytes(deck.order),
+    ]
+    for p in game.players:
+        name = p.name.encode()
+        if not -0x8000 <= p.pending_bullet_modifier <= 0x7FFF:
+            raise ValueError(f"{p.name}'s pending bullet modifier doesn't fit a checkpoint")
+        if max(p.extra_life_rounds, p.extra_cards_next_round, len(p.hand)) > 255 or len(name) > 0xFFFF:
+            raise ValueError(f"{p.name}'s hand, effect counters or name don't fit a checkpoint")
+        parts.append(PLAYER.pack(p.safe_trigger, p.extra_life_rounds, p.pending_bullet_modifier,
+                                 p.forced_extra_turn, p.extra_cards_next_round, p.block_active,
+                                 len(p.hand), len(name)))
+        parts.append(bytes([card.card_id for card in p.hand]))
+        parts.append(name)
+        played = p.played.to_bytes((p.played.bit_length() + 7) // 8, "little")
+        parts.append(bytes([len(played)]))
+        parts.append(played)
+    active = [p.seat for p in order.active]
+    parts.append(struct.pack(f"<{2 * n}HH{len(active)}H", *order.succ, *order.pred,
+                             len(active), *active))
+    eliminated = game.eliminated
+    played = [0] * len(CARDS.types)
+    ids = CARDS.ids
+    for name, count in game.cards_played.items():
+        played[ids[name]] = count
+    if max(played, default=0) > 0xFFFFFFFF:
+        raise ValueError("Checkpoints count at most 2**32 - 1 plays of a card")
+    parts.append(struct.pack(f"<H{len(eliminated)}H{len(eliminated)}IH{len(played)}I",
+                             len(eliminated), *eliminated, *game.elimination_rounds,
+                             len(played), *played))
+    parts.append(bytes([game.hand_size]))
+    data = b"".join(parts)
+    return data + CRC.pack(zlib.crc32(data))
+
+# -------- Decoding --------
+
+def loads(data, deciders=None, presenter=None, rng=None):
+    # Rebuilds the Game. Deciders default to None per seat, to be attached
+    # before it is played, and the presenter to a NullPresenter. Raises
+    # ValueError for anything but an intact checkpoint of this version.
+    if len(data) < HEADER.size + CRC.size:
+        raise ValueError("Checkpoint is truncated")
+    body = memoryview(data)[:-CRC.size]
+    if CRC.unpack_from(data, len(body))[0] != zlib.crc32(body):
+        raise ValueError("Checkpoint is corrupt")
+    magic, version = body[:4], body[4]
+    if magic != MAGIC:
+        raise ValueError("Not a game checkpoint")
+    if version != VERSION:
+        raise ValueError(f"Unsupported checkpoint version {version}")
+    try:
+        snapshot, names, num_chambers, template, hand_size = decode(body)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Checkpoint is malformed: {e}") from None
+
+    n = len(names)
+    if deciders is None:
+        deciders = [None] * n
+    if presenter is None:
+        presenter = NullPresenter()
+    game = Game.blank(names, deciders, presenter, rng, num_chambers, template, hand_size=hand_size)
+    game.restore(snapshot)
+    return game
+
+def decode(body):
+    # (snapshot, names, chambers, deck template, hand size) from a checkpoint
+    # body whose CRC, magic and version have been checked. A malformed one
+    # raises ValueError, or struct.error, IndexError or UnicodeDecodeError
+    # from the field it broke on.
+    (_, _, n, num_chambers, current_chamber, current, reversed_, last, round_count,
+     deck_position, deck_length, template_length) = HEADER.unpack_from(body)
+    offset = HEADER.size
+    mask_length = (num_chambers + 7) // 8
+    mask = int.from_bytes(body[offset:offset + mask_length], "little")
+    offset += mask_length
+    template = array('B', body[offset:offset + template_length]) if template_length else None
+    offset += template_length
+    deck_order = array('B', body[offset:offset + deck_length])
+    offset += deck_length
+
+    cards = CARDS.cards
+    names = []
+    players = []
+    for _ in range(n):
+        (safe, extra_life, pending, forced, extra_cards, block, hand_size,
+         name_length) = PLAYER.unpack_from(body, offset)
+        offset += PLAYER.size
+        hand = tuple([cards[i] for i in body[offset:offset + hand_size]])
+        offset += hand_size
+        names.append(str(body[offset:offset + name_length], "utf-8"))
+        offset += name_length
+        mask_length = body[offset]
+        played = int.from_bytes(body[offset + 1:offset + 1 + mask_length], "little")
+        offset += 1 + mask_length
+        players.append((hand, bool(safe), extra_life, pending, bool(forced), extra_cards,
+                        bool(block), played))
+
+    ring = struct.unpack_from(f"<{2 * n}HH", body, offset)
+    offset += 4 * n + 2
+    count = ring[-1]
+    active = struct.unpack_from(f"<{count}H", body, offset)
+    offset += 2 * count
+    (count,) = COUNT.unpack_from(body, offset)
+    offset += COUNT.size
+    eliminated = struct.unpack_from(f"<{count}H{count}I", body, offset)
+    offset += 6 * count
+    (types,) = COUNT.unpack_from(body, offset)
+    offset += COUNT.size
+    played = struct.unpack_from(f"<{types}I", body, offset)
+    offset += 4 * types
+    hand_size = body[offset]
+    if offset + 1 != len(body) or len(deck_order) != deck_length:
+        raise ValueError("Checkpoint is malformed: its fields don't add up to its length")
+    if any(seat >= n for seat in ring[:2 * n] + active + (current,)):
+        raise ValueError("Checkpoint is malformed: turn order names a seat that doesn't exist")
+
+    snapshot = GameSnapshot.__new__(GameSnapshot)
+    snapshot.deck_order = deck_order
+    snapshot.deck_position = deck_position
+    snapshot.mask = mask
+    snapshot.loaded = mask.bit_count()
+    snapshot.current_chamber = current_chamber
+    snapshot.players = players
+    snapshot.turn_order = (ring[:n], ring[n:2 * n], active, current, bool(reversed_))
+    snapshot.last_card_played = None if last == NO_CARD else cards[last]
+    snapshot.round_count = round_count
+    snapshot.eliminated = eliminated[:count]
+    snapshot.elimination_rounds = eliminated[count:]
+    snapshot.cards_played = [(CARDS.types[i].name, c) for i, c in enumerate(played) if c]
+    return snapshot, names, num_chambers, template, hand_size
+
+# -------- Files --------
+
+def save(game, path, fsync=False):
+    # Atomic: readers see the old checkpoint or the new one, never half of
+    # one. fsync makes it durable across power loss too, at a cost of
+    # milliseconds rather than microseconds.
+    data = dumps(game)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def load(path, deciders=None, presenter=None, rng=None):
+    with open(path, "rb") as f:
+        return loads(f.read(), deciders, presenter, rng)
+
+class CheckpointStore:
+    # One checkpoint file per table in a directory. Table IDs are hex-encoded
+    # into file names, so any string is safe to use as one.
+    SUFFIX = ".rrck"
+
+    def __init__(self, directory, fsync=False):
+        self.directory = directory
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, table_id):
+        return os.path.join(self.directory, table_id.encode().hex() + self.SUFFIX)
+
+    def save(self, table_id, game):
+        save(game, self.path(table_id), self.fsync)
+
+    def load(self, table_id, deciders=None, presenter=None, rng=None):
+        return load(self.path(table_id), deciders, presenter, rng)
+
+    def remove(self, table_id):
+        try:
+            os.remove(self.path(table_id))
+        except FileNotFoundError:
+            pass
+
+    def table_ids(self):
+        ids = []
+        for filename in sorted(os.listdir(self.directory)):
+            stem, suffix = os.path.splitext(filename)
+            if suffix != self.SUFFIX:
+                continue
+            try:
+                ids.append(bytes.fromhex(stem).decode())
+            except ValueError:
+                continue
+        return ids
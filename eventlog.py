@@ -0,0 +1,291 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+
+# Append-only binary log of game events. Every record has the same 16-byte
+# little-endian layout, so a reader can walk a file of any size with
+# struct.iter_unpack over an mmap and never parse text:
+#
+#   game_id  uint32   which game the event belongs to, unique within the log
+#   round    uint16   Game.round_count when it happened (0 = setup)
+#   kind     uint8    one of the event kinds below
+#            uint8    padding
+#   seat     uint16   seat index of the acting player
+#   a, b     uint16   event-specific arguments (card ID, chamber, target...)
+#   c        uint16   reserved, always 0 for now
+#
+# A file starts with a 16-byte header so records stay aligned.
+#
+# A writer numbers its games on from the highest game ID already in the
+# log, so runs appended one after another never reuse an ID. Runs appending
+# to the same log at the same time can; game_ids() reports any ID that was
+# used twice, and replay() refuses it.
+
+RECORD = struct.Struct("<IHBxHHHH")
+HEADER = b"RRLOG\x00\x01" + bytes(9)   # Magic plus format version 1.
+NO_SEAT = 0xFFFF
+MAX_SEATS = NO_SEAT    # Seats (and players) a record can name.
+
+# -------- Event Kinds --------
+
+GAME_START = 1        # seat = number of players, a = number of chambers
+GAME_END = 2          # seat = winner (NO_SEAT if nobody won)
+TURN_START = 3        # seat = player whose turn it is
+CARD_DRAWN = 4        # a = card ID
+CARD_DISCARDED = 5    # a = card ID
+CARD_PLAYED = 6       # a = card ID
+CARD_REPLICATED = 7   # a = card ID copied by "Anotha’ time"
+TARGET = 8            # a = target seat
+BLOCKED = 9           # seat = player whose "Enhanced nope" blocked the effect
+HANDS_SWAPPED = 10    # a = other seat
+CARD_STOLEN = 11      # a = victim seat, b = card ID
+CHAMBER_SET = 12      # a = new current chamber (setup, spin, "Master of fate")
+BULLET_ADDED = 13     # a = chamber
+BULLET_REMOVED = 14   # a = chamber
+TRIGGER = 15          # a = chamber pulled, b = TRIGGER_* result
+ELIMINATED = 16       # seat = eliminated player
+ORDER_REVERSED = 17
+
+TRIGGER_CLICK = 0
+TRIGGER_SAVED = 1      # Fired, but "Can’t touch this" or an extra life saved them.
+TRIGGER_FATAL = 2
+
+# -------- Writer --------
+
+def create_log(path):
+    # Creates an empty log at `path` unless there already is a file there.
+    # The header is written to a temporary file and linked into place, so
+    # processes racing to create the same log never see it without one.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER)
+    try:
+        os.link(tmp, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp)
+
+def next_game_id(path):
+    # One more than the highest game ID in the log at `path` (0 if there is
+    # none yet). Reads every record, but at C speed.
+    if not os.path.exists(path):
+        return 0
+    with EventLogReader(path) as reader:
+        if not len(reader):
+            return 0
+        # game_id is the first of every record's four 32-bit words.
+        with reader.view.cast("I") as words, words[::RECORD.size // 4] as ids:
+            if sys.byteorder == "little":
+                return max(ids) + 1
+            ids = array("I", ids)
+            ids.byteswap()
+            return max(ids) + 1
+
+def check_header(path):
+    with open(path, "rb") as f:
+        header = f.read(len(HEADER))
+    if header[:5] != HEADER[:5]:
+        raise ValueError(f"{path} is not a game event log")
+    if header[6] != HEADER[6]:
+        raise ValueError(f"{path} uses unsupported log version {header[6]}")
+
+class EventLogWriter:
+    # Buffers packed records and appends them to `path` with single O_APPEND
+    # writes, so several processes can share one log without splitting records.
+    # Games get IDs from first_game_id on, by default one more than the
+    # highest already in the log.
+    def __init__(self, path, buffer_records=65536, first_game_id=None):
+        self.path = path
+        self.buffer = bytearray()
+        self.flush_at = buffer_records * RECORD.size
+        create_log(path)
+        check_header(path)
+        self.next_game_id = next_game_id(path) if first_game_id is None else first_game_id
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+
+    def new_game_id(self):
+        game_id = self.next_game_id
+        self.next_game_id += 1
+        return game_id
+
+    def record(self, game_id, round_count, kind, seat=0, a=0, b=0):
+        self.buffer += RECORD.pack(game_id, round_count, kind, seat, a, b, 0)
+        if len(self.buffer) >= self.flush_at:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            os.write(self.fd, self.buffer)
+            self.buffer.clear()
+
+    def close(self):
+        if self.fd is not None:
+            self.flush()
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# -------- Reader and Replay --------
+
+class ReplayState:
+    # What a game looked like after a given point in its log.
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.round = 0
+        self.num_players = 0
+        self.num_chambers = 0
+        self.mask = 0                # Bit i set = chamber i loaded.
+        self.current_chamber = 0
+        self.order = []              # Active seats in turn order.
+        self.eliminated = []         # Seats in elimination order.
+        self.hands = []              # Card IDs per seat.
+        self.cards_played = Counter()
+        self.last_card_played = None
+        self.current_seat = None
+        self.winner = None
+        self.finished = False
+
+    def apply(self, round_count, kind, seat, a, b):
+        if kind == GAME_START:
+            # A game starts from nothing, whatever was applied before.
+            self.__init__(self.game_id)
+            self.num_players = seat
+            self.num_chambers = a
+            self.order = list(range(seat))
+            self.hands = [[] for _ in range(seat)]
+            return
+        self.round = round_count
+        if kind == TURN_START:
+            self.current_seat = seat
+        elif kind == CARD_DRAWN:
+            self.hands[seat].append(a)
+        elif kind == CARD_DISCARDED or kind == CARD_PLAYED:
+            self.hands[seat].remove(a)
+            if kind == CARD_PLAYED:
+                self.cards_played[a] += 1
+                self.last_card_played = a
+        elif kind == HANDS_SWAPPED:
+            self.hands[seat], self.hands[a] = self.hands[a], self.hands[seat]
+        elif kind == CARD_STOLEN:
+            self.hands[a].remove(b)
+            self.hands[seat].append(b)
+        elif kind == CHAMBER_SET:
+            self.current_chamber = a
+        elif kind == BULLET_ADDED:
+            self.mask |= 1 << a
+        elif kind == BULLET_REMOVED:
+            self.mask &= ~(1 << a)
+        elif kind == TRIGGER:
+            self.current_chamber = (a + 1) % self.num_chambers
+        elif kind == ELIMINATED:
+            self.order.remove(seat)
+            self.eliminated.append(seat)
+        elif kind == ORDER_REVERSED:
+            self.order.reverse()
+        elif kind == GAME_END:
+            self.winner = None if seat == NO_SEAT else seat
+            self.finished = True
+
+class EventLogReader:
+    # Memory-maps a log and decodes records straight out of the mapping.
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        if size < len(HEADER):
+            self.map = None
+            self.view = memoryview(b"")
+        else:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.map[:5] != HEADER[:5]:
+                raise ValueError(f"{path} is not a game event log")
+            if self.map[6] != HEADER[6]:
+                raise ValueError(f"{path} uses unsupported log version {self.map[6]}")
+            # Ignore a torn record at the end left by a crashed writer.
+            end = len(HEADER) + (size - len(HEADER)) // RECORD.size * RECORD.size
+            self.view = memoryview(self.map)[len(HEADER):end]
+
+    def __len__(self):
+        return len(self.view) // RECORD.size
+
+    def __iter__(self):
+        # (game_id, round, kind, seat, a, b, c) tuples in file order.
+        return RECORD.iter_unpack(self.view)
+
+    def records(self, start=0):
+        # Like iterating the reader, but from record number `start` on.
+        return RECORD.iter_unpack(self.view[start * RECORD.size:])
+
+    def events(self, game_id):
+        return [record for record in self if record[0] == game_id]
+
+    def game_ids(self):
+        # Sorted IDs of every game started in the log. An ID appears once per
+        # game that used it, so duplicates from overlapping runs show up.
+        return sorted(record[0] for record in self if record[2] == GAME_START)
+
+    def replay(self, game_id, until_round=None):
+        # Rebuilds a game's state from its events alone; with until_round, stops
+        # before the first event of any later round. Raises ValueError if two
+        # games in the log share the ID.
+        state = ReplayState(game_id)
+        started = False
+        for gid, round_count, kind, seat, a, b, _ in self:
+            if gid != game_id:
+                continue
+            if kind == GAME_START:
+                if started:
+                    raise ValueError(f"Game ID {game_id} is used by more than one game in this log")
+                started = True
+            if until_round is not None and round_count > until_round:
+                break
+            state.apply(round_count, kind, seat, a, b)
+        return state
+
+    def close(self):
+        self.view.release()
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv):
+    # python eventlog.py LOG [GAME_ID [ROUND]]: summarise a log or replay one game.
+    from RussianROULETTED import CARDS
+    with EventLogReader(argv[0]) as reader:
+        if len(argv) == 1:
+            ids = reader.game_ids()
+            print(f"{len(reader)} events, {len(ids)} games")
+            duplicates = sorted(gid for gid, count in Counter(ids).items() if count > 1)
+            if duplicates:
+                print(f"{len(duplicates)} game IDs are used by more than one game: "
+                      f"{' '.join(map(str, duplicates[:20]))}{' ...' if len(duplicates) > 20 else ''}")
+            return
+        until = int(argv[2]) if len(argv) > 2 else None
+        try:
+            state = reader.replay(int(argv[1]), until)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(f"Game {state.game_id}, round {state.round}, "
+              f"{'finished' if state.finished else 'in progress'}")
+        chambers = "".join("X" if state.mask >> i & 1 else "." for i in range(state.num_chambers))
+        print(f"Chambers {chambers}, next chamber {state.current_chamber}")
+        print(f"Turn order {state.order}, eliminated {state.eliminated}, winner {state.winner}")
+        for seat, hand in enumerate(state.hands):
+            print(f"  Seat {seat}: {', '.join(CARDS.types[c].name for c in hand)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,312 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from RussianROULETTED import CARDS
+from eventlog import (
+    BLOCKED, BULLET_ADDED, BULLET_REMOVED, CARD_PLAYED, CARD_REPLICATED, GAME_END, GAME_START,
+    NO_SEAT, TARGET, TRIGGER, TRIGGER_FATAL, TRIGGER_SAVED, TURN_START,
+    EventLogReader,
+)
+
+# SQLite store of simulated games for ad-hoc questions:
+#
+#   python RussianROULETTED.py --simulate 1000000 --workers 8 --log games.rrlog
+#   python gamestore.py games.db ingest games.rrlog
+#   python gamestore.py games.db winrate "Give Jimmy a chance" --min-loaded 3
+#   python gamestore.py games.db replicated "Focused action"
+#   python gamestore.py games.db sql "SELECT loaded, avg(result = 2) FROM pulls GROUP BY loaded"
+#
+# Event logs are replayed into three tables, one row per game, per card
+# played and per trigger pull:
+#
+#   games  id, source, log_game_id, players, chambers, winner (seat or NULL), rounds
+#   plays  game, round, seat, card, target, replicated, blocked, loaded, won
+#   pulls  game, round, seat, loaded, result, won
+#
+# card and replicated are card IDs (the cards table has their names), target
+# is a seat, loaded is how many chambers held a bullet when the card was
+# played or the trigger pulled, result is one of TRIGGER_CLICK, _SAVED or
+# _FATAL, and won says whether that seat won the game. won is copied into
+# every row so the usual "win rate when ..." questions are answered from
+# one index without joining, and the indexes cover the columns they filter
+# and count on: the cost of a query grows with the rows it matches, not
+# with the size of the store.
+#
+# Rows are inserted in batched transactions. Ingesting into an empty store
+# builds the indexes once at the end, which is much faster than keeping
+# them up to date row by row.
+#
+# Each log's path is recorded with how far it has been read, so ingesting
+# a log again after more games were appended to it loads only the new
+# games. Games still unfinished at the end of the log are picked up on the
+# next ingest: reading resumes from the start of the earliest of them, and
+# games in the re-read stretch that are already stored are skipped.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (id INTEGER PRIMARY KEY, path TEXT UNIQUE, games INTEGER,
+                                    ingested TEXT, records INTEGER, resume INTEGER);
+CREATE TABLE IF NOT EXISTS cards (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS games (id INTEGER PRIMARY KEY, source INTEGER, log_game_id INTEGER,
+                                  players INTEGER, chambers INTEGER, winner INTEGER,
+                                  rounds INTEGER);
+CREATE TABLE IF NOT EXISTS plays (game INTEGER, round INTEGER, seat INTEGER, card INTEGER,
+                                  target INTEGER, replicated INTEGER, blocked INTEGER,
+                                  loaded INTEGER, won INTEGER);
+CREATE TABLE IF NOT EXISTS pulls (game INTEGER, round INTEGER, seat INTEGER, loaded INTEGER,
+                                  result INTEGER, won INTEGER);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS plays_by_card ON plays (card, loaded, won);
+CREATE INDEX IF NOT EXISTS plays_by_replicated ON plays (replicated, card, game)
+    WHERE replicated IS NOT NULL;
+CREATE INDEX IF NOT EXISTS plays_by_game ON plays (game);
+CREATE INDEX IF NOT EXISTS pulls_by_result ON pulls (result, loaded, won);
+CREATE INDEX IF NOT EXISTS pulls_by_game ON pulls (game);
+CREATE INDEX IF NOT EXISTS games_by_log_id ON games (source, log_game_id);
+"""
+
+# -------- Ingestion --------
+
+class GameRows:
+    # Rows of one game being replayed, held until its GAME_END says who won.
+    __slots__ = ("start", "players", "chambers", "mask", "plays", "pulls", "last_play")
+
+    def __init__(self, start, players, chambers):
+        self.start = start       # Record number of its GAME_START.
+        self.players = players
+        self.chambers = chambers
+        self.mask = 0            # Loaded chambers, as in ReplayState.
+        self.plays = []          # [round, seat, card, target, replicated, blocked, loaded]
+        self.pulls = []          # (round, seat, loaded, result)
+        self.last_play = None    # Row that TARGET, BLOCKED and CARD_REPLICATED refer to.
+
+class GameStore:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.db.executemany("INSERT OR IGNORE INTO cards (id, name) VALUES (?, ?)",
+                            [(card_type.card_id, card_type.name) for card_type in CARDS.types])
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def ingest(self, log_path, batch_rows=200000, say=print):
+        # Loads every finished game of an event log not already stored;
+        # returns the number of games added. Games cut off at the end of
+        # the log are left for the next ingest of the same log.
+        db = self.db
+        source_path = os.path.abspath(log_path)
+        known = db.execute("SELECT id, records, resume FROM sources WHERE path = ?",
+                           (source_path,)).fetchone()
+        with EventLogReader(log_path) as reader:
+            if known is not None:
+                source, seen, resume = known
+                if len(reader) < seen:
+                    raise ValueError(f"{log_path} is shorter than when it was ingested")
+                if len(reader) == seen and resume == seen:
+                    say(f"No new games in {log_path}")
+                    return 0
+                db.executescript(INDEXES)
+            else:
+                seen = resume = 0
+            empty = db.execute("SELECT NOT EXISTS (SELECT 1 FROM games)").fetchone()[0]
+            if empty:
+                self.drop_indexes()
+            db.execute("PRAGMA synchronous = OFF")
+            if known is None:
+                cursor = db.execute("INSERT INTO sources (path, games, records, resume) "
+                                    "VALUES (?, 0, 0, 0)", (source_path,))
+                source = cursor.lastrowid
+            added = self.replay(reader, source, resume, seen, batch_rows, say, log_path)
+        if empty:
+            say("Building indexes...")
+        self.create_indexes()
+        return added
+
+    def replay(self, reader, source, resume, seen, batch_rows, say, log_path):
+        # Replays records from number `resume` on. Games starting before
+        # record `seen` were read by an earlier ingest and may be stored.
+        db = self.db
+        next_id = db.execute("SELECT coalesce(max(id), 0) + 1 FROM games").fetchone()[0]
+        games, plays, pulls = [], [], []
+        live = {}
+        added = 0
+        start = time.perf_counter()
+        for index, (game_id, round_count, kind, seat, a, b, _) in enumerate(reader.records(resume),
+                                                                            resume):
+            if kind == GAME_START:
+                if index < seen and db.execute(
+                        "SELECT 1 FROM games WHERE source = ? AND log_game_id = ?",
+                        (source, game_id)).fetchone():
+                    continue
+                live[game_id] = GameRows(index, seat, a)
+                continue
+            rows = live.get(game_id)
+            if rows is None:
+                continue
+            if kind == CARD_PLAYED:
+                rows.last_play = [round_count, seat, a, None, None, 0, rows.mask.bit_count()]
+                rows.plays.append(rows.last_play)
+            elif kind == BULLET_ADDED:
+                rows.mask |= 1 << a
+            elif kind == BULLET_REMOVED:
+                rows.mask &= ~(1 << a)
+            elif kind == TRIGGER:
+                rows.pulls.append((round_count, seat, rows.mask.bit_count(), b))
+                rows.last_play = None
+            elif kind == TURN_START:
+                rows.last_play = None
+            elif rows.last_play is not None:
+                if kind == TARGET and rows.last_play[3] is None:
+                    rows.last_play[3] = a
+                elif kind == BLOCKED:
+                    rows.last_play[5] = 1
+                elif kind == CARD_REPLICATED:
+                    rows.last_play[4] = a
+            if kind != GAME_END:
+                continue
+            del live[game_id]
+            winner = None if seat == NO_SEAT else seat
+            games.append((next_id, source, game_id, rows.players, rows.chambers, winner, round_count))
+            plays.extend((next_id, *row, row[1] == winner) for row in rows.plays)
+            pulls.extend((next_id, *row, row[1] == winner) for row in rows.pulls)
+            next_id += 1
+            added += 1
+            if len(plays) + len(pulls) >= batch_rows:
+                self.insert(games, plays, pulls)
+                games, plays, pulls = [], [], []
+        self.insert(games, plays, pulls)
+        end = len(reader)
+        db.execute("UPDATE sources SET games = games + ?, ingested = ?, records = ?, resume = ? "
+                   "WHERE id = ?", (added, time.strftime("%Y-%m-%dT%H:%M:%S"), end,
+                                    min((rows.start for rows in live.values()), default=end),
+                                    source))
+        db.commit()
+        elapsed = time.perf_counter() - start
+        say(f"Ingested {added} games from {log_path} in {elapsed:.1f}s"
+            + (f" ({len(live)} unfinished games left for the next ingest)" if live else ""))
+        return added
+
+    def insert(self, games, plays, pulls):
+        # One transaction per batch.
+        with self.db:
+            self.db.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?)", games)
+            self.db.executemany("INSERT INTO plays VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", plays)
+            self.db.executemany("INSERT INTO pulls VALUES (?, ?, ?, ?, ?, ?)", pulls)
+
+    def drop_indexes(self):
+        for (name,) in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'index' "
+                                       "AND sql IS NOT NULL").fetchall():
+            self.db.execute(f"DROP INDEX {name}")
+
+    def create_indexes(self):
+        self.db.executescript(INDEXES)
+        self.db.execute("ANALYZE")
+        self.db.commit()
+
+    # -------- Queries --------
+
+    def query(self, sql, params=()):
+        return self.db.execute(sql, params).fetchall()
+
+    def counts(self):
+        return {table: self.db.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                for table in ("games", "plays", "pulls")}
+
+    def card_win_rate(self, card, min_loaded=0, max_loaded=None):
+        # (times played, times the player went on to win) for a card played
+        # with between min_loaded and max_loaded bullets in the gun.
+        card_id = CARDS.card_id(CARDS.lookup(card))
+        max_loaded = 64 if max_loaded is None else max_loaded
+        return self.db.execute(
+            "SELECT count(*), coalesce(sum(won), 0) FROM plays "
+            "WHERE card = ? AND loaded BETWEEN ? AND ?", (card_id, min_loaded, max_loaded)).fetchone()
+
+    def win_rates_by_loaded(self, card):
+        # [(loaded, times played, wins)] for a card.
+        card_id = CARDS.card_id(CARDS.lookup(card))
+        return self.db.execute(
+            "SELECT loaded, count(*), sum(won) FROM plays WHERE card = ? "
+            "GROUP BY loaded ORDER BY loaded", (card_id,)).fetchall()
+
+    def replicated_games(self, copied, card="Anotha’ time", limit=None):
+        # IDs of games where `card` replicated `copied`.
+        sql = ("SELECT DISTINCT game FROM plays WHERE replicated = ? AND card = ? ORDER BY game"
+               + (" LIMIT ?" if limit is not None else ""))
+        params = (CARDS.card_id(CARDS.lookup(copied)), CARDS.card_id(CARDS.lookup(card)))
+        return [row[0] for row in self.db.execute(sql, params + ((limit,) if limit is not None else ()))]
+
+    def pull_outcomes(self):
+        # [(loaded, pulls, fatal, saved)] over every trigger pull.
+        return self.db.execute(
+            "SELECT loaded, count(*), sum(result = ?), sum(result = ?) FROM pulls "
+            "GROUP BY loaded ORDER BY loaded", (TRIGGER_FATAL, TRIGGER_SAVED)).fetchall()
+
+# -------- Main --------
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="SQLite store of simulated games.")
+    parser.add_argument("db", help="database file (created if missing)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="load event logs")
+    ingest.add_argument("logs", nargs="+")
+    ingest.add_argument("--batch-rows", type=int, default=200000, help="rows per transaction")
+    sub.add_parser("summary", help="row counts and trigger odds by bullets loaded")
+    winrate = sub.add_parser("winrate", help="win rate of players who played a card")
+    winrate.add_argument("card")
+    winrate.add_argument("--min-loaded", type=int, default=0)
+    winrate.add_argument("--max-loaded", type=int)
+    winrate.add_argument("--by-loaded", action="store_true", help="one line per bullet count")
+    replicated = sub.add_parser("replicated", help="games where “Anotha’ time” copied a card")
+    replicated.add_argument("card")
+    replicated.add_argument("--limit", type=int, default=20)
+    sql = sub.add_parser("sql", help="run any SQL and print the rows")
+    sql.add_argument("statement")
+    args = parser.parse_args(argv)
+
+    with GameStore(args.db) as store:
+        start = time.perf_counter()
+        try:
+            if args.command == "ingest":
+                for log in args.logs:
+                    store.ingest(log, args.batch_rows)
+            elif args.command == "summary":
+                print(", ".join(f"{count} {table}" for table, count in store.counts().items()))
+                print(f"{'loaded':>6} {'pulls':>12} {'fatal':>8} {'saved':>8}")
+                for loaded, pulls, fatal, saved in store.pull_outcomes():
+                    print(f"{loaded:6} {pulls:12} {fatal / pulls:8.1%} {saved / pulls:8.1%}")
+            elif args.command == "winrate":
+                name = CARDS.lookup(args.card)
+                if args.by_loaded:
+                    for loaded, played, wins in store.win_rates_by_loaded(name):
+                        print(f"{loaded} loaded: {wins / played:.1%} of {played}")
+                else:
+                    played, wins = store.card_win_rate(name, args.min_loaded, args.max_loaded)
+                    rate = f"{wins / played:.1%}" if played else "-"
+                    print(f"{name}: players went on to win {rate} of {played} plays")
+            elif args.command == "replicated":
+                games = store.replicated_games(args.card, limit=args.limit)
+                print(f"Games where Anotha’ time replicated {CARDS.lookup(args.card)}: "
+                      f"{' '.join(map(str, games)) or 'none'}")
+            else:
+                for row in store.query(args.statement):
+                    print("\t".join("" if value is None else str(value) for value in row))
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"({time.perf_counter() - start:.3f}s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,197 @@
+import os
+from time import perf_counter_ns
+
+from RussianROULETTED import Deck, Game, Revolver
+
+# Opt-in timing and counters for the engine's hot paths:
+#
+#   card_effect   Game.apply_card_effect_steps, labelled by card name
+#   deck          Deck.draw and Deck.populate_deck, which also shuffles every
+#                 new deck; refills counts only the populates a draw needed
+#   revolver      add_bullet, remove_bullet, pull_trigger, spin, set_chamber
+#   trigger       Game.resolve_trigger_steps, labelled by result
+#
+# enable() swaps timing wrappers into those classes and disable() puts the
+# original functions back, so a disabled engine runs exactly the code it
+# would without this module: there is no flag to test on the hot path
+# (bench.py's "instrument" group checks this). Step generators are timed
+# only while they run, not while they wait on a decider or a pause; a
+# replicated card's time also counts towards "Anotha’ time".
+#
+# Wrappers patch the classes process-wide, so only one Instrumentation can
+# be enabled at a time, and games in worker processes aren't measured.
+
+# Histogram buckets are powers of two in nanoseconds, from 256 ns to ~1 s.
+FIRST_BUCKET_BITS = 8
+BUCKET_BOUNDS_NS = [1 << bits for bits in range(FIRST_BUCKET_BITS, 31)]
+
+class Timer:
+    __slots__ = ("count", "total_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_NS) + 1)   # Last bucket is +Inf.
+
+    def observe(self, ns):
+        self.count += 1
+        self.total_ns += ns
+        # Bucket i holds durations up to BUCKET_BOUNDS_NS[i].
+        self.buckets[min(max((ns - 1).bit_length() - FIRST_BUCKET_BITS, 0), len(BUCKET_BOUNDS_NS))] += 1
+
+    def as_dict(self):
+        return {"count": self.count, "total_ns": self.total_ns, "buckets": list(self.buckets)}
+
+def timed_steps(steps, observe):
+    # Passes a step generator through, timing only its own execution.
+    elapsed = 0
+    reply = None
+    while True:
+        start = perf_counter_ns()
+        try:
+            request = steps.send(reply)
+        except StopIteration as stop:
+            observe(elapsed + perf_counter_ns() - start, stop.value)
+            return stop.value
+        elapsed += perf_counter_ns() - start
+        reply = yield request
+
+# (class, method name, family, label) for every plain method that gets timed.
+TIMED_METHODS = [
+    (Deck, "draw", "deck", "draw"),
+    (Deck, "populate_deck", "deck", "populate_deck"),
+    (Revolver, "add_bullet", "revolver", "add_bullet"),
+    (Revolver, "remove_bullet", "revolver", "remove_bullet"),
+    (Revolver, "pull_trigger", "revolver", "pull_trigger"),
+    (Revolver, "spin", "revolver", "spin"),
+    (Revolver, "set_chamber", "revolver", "set_chamber"),
+]
+
+# Family -> (Prometheus metric name, label name, help text).
+FAMILIES = {
+    "card_effect": ("rr_card_effect_seconds", "card", "Time resolving a played card's effect."),
+    "deck": ("rr_deck_seconds", "op", "Time in Deck operations; populate_deck also runs once per new deck."),
+    "revolver": ("rr_revolver_seconds", "op", "Time in Revolver operations."),
+    "trigger": ("rr_trigger_seconds", "result", "Time resolving a trigger pull, excluding suspense."),
+}
+
+class Instrumentation:
+    active = None    # The enabled instance, if any.
+
+    def __init__(self):
+        self.timers = {family: {} for family in FAMILIES}
+        self.cards_drawn = 0
+        self.refills = 0     # Deck refills that draws needed; not the first shuffle.
+        self.originals = []
+
+    def timer(self, family, label):
+        timers = self.timers[family]
+        timer = timers.get(label)
+        if timer is None:
+            timer = timers[label] = Timer()
+        return timer
+
+    def enable(self):
+        if Instrumentation.active is not None:
+            raise RuntimeError("Instrumentation is already enabled")
+        Instrumentation.active = self
+        for cls, name, family, label in TIMED_METHODS:
+            self._patch(cls, name, self._timed(getattr(cls, name), self.timer(family, label)))
+        draw = Deck.draw
+        def counted_draw(deck, n):
+            short = n - len(deck)
+            cards = draw(deck, n)
+            self.cards_drawn += len(cards)
+            if short > 0:
+                # Each refill supplies a whole template's worth of cards.
+                size = len(deck.template)
+                self.refills += -(-short // size) if size else 1
+            return cards
+        self._patch(Deck, "draw", counted_draw)
+
+        apply_steps = Game.apply_card_effect_steps
+        card_timer = self.timer
+        def apply_card_effect_steps(game, card, player):
+            observe = card_timer("card_effect", card.name).observe
+            return (yield from timed_steps(apply_steps(game, card, player),
+                                           lambda ns, effect: observe(ns)))
+        self._patch(Game, "apply_card_effect_steps", apply_card_effect_steps)
+
+        trigger_steps = Game.resolve_trigger_steps
+        def resolve_trigger_steps(game, player):
+            return (yield from timed_steps(trigger_steps(game, player),
+                                           lambda ns, result: card_timer("trigger", result).observe(ns)))
+        self._patch(Game, "resolve_trigger_steps", resolve_trigger_steps)
+        return self
+
+    def _patch(self, cls, name, wrapper):
+        self.originals.append((cls, name, cls.__dict__[name]))
+        setattr(cls, name, wrapper)
+
+    @staticmethod
+    def _timed(fn, timer):
+        observe = timer.observe
+        def wrapper(*args):
+            start = perf_counter_ns()
+            try:
+                return fn(*args)
+            finally:
+                observe(perf_counter_ns() - start)
+        return wrapper
+
+    def disable(self):
+        # Restores the originals, newest patch first.
+        while self.originals:
+            cls, name, original = self.originals.pop()
+            setattr(cls, name, original)
+        if Instrumentation.active is self:
+            Instrumentation.active = None
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    # -------- Export --------
+
+    def snapshot(self):
+        # Plain dict of every counter and histogram; bucket i counts durations
+        # up to bucket_bounds_ns[i], the last bucket is everything longer.
+        result = {"bucket_bounds_ns": list(BUCKET_BOUNDS_NS), "cards_drawn": self.cards_drawn,
+                  "refills": self.refills}
+        for family, timers in self.timers.items():
+            result[family] = {label: timer.as_dict() for label, timer in sorted(timers.items())}
+        return result
+
+    def prometheus(self):
+        # Prometheus text exposition format.
+        lines = [
+            "# HELP rr_deck_cards_drawn_total Cards drawn from decks.",
+            "# TYPE rr_deck_cards_drawn_total counter",
+            f"rr_deck_cards_drawn_total {self.cards_drawn}",
+            "# HELP rr_deck_refills_total Deck refills needed by draws (not the first shuffle).",
+            "# TYPE rr_deck_refills_total counter",
+            f"rr_deck_refills_total {self.refills}",
+        ]
+        for family, timers in self.timers.items():
+            metric, label_name, help_text = FAMILIES[family]
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for label, timer in sorted(timers.items()):
+                label = label.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip(BUCKET_BOUNDS_NS + [None], timer.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound is None else f"{bound / 1e9:.9g}"
+                    lines.append(f'{metric}_bucket{{{label_name}="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{{label_name}="{label}"}} {timer.total_ns / 1e9:.9g}')
+                lines.append(f'{metric}_count{{{label_name}="{label}"}} {timer.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # Atomic replace, for node_exporter's textfile collector and the like.
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
@@ -0,0 +1,353 @@
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from RussianROULETTED import CARDS, Game, NullPresenter, RandomDecider
+
+# Information-set Monte Carlo tree search bot (single-observer ISMCTS).
+#
+# The search runs when the bot is asked choose_action, which is always the
+# first decision of its turn. Each iteration:
+#
+#   1. determinizes what the bot can't see: the opponents' hands and the
+#      draw pile are redealt from the unseen cards, and the loaded chambers
+#      are redrawn at random for the same (public) bullet count;
+#   2. replays the turn on a clone of the game, picking the bot's own
+#      decisions down the tree by UCB with availability counts;
+#   3. plays the game out with RandomDecider for everyone;
+#   4. backs up 1 for a win, 1/n for a round-limit tie between n survivors.
+#
+# Tree nodes are the bot's decisions so far this turn, keyed by
+# (method, answer), so every later decision of the same turn (card, target,
+# chamber...) is answered from the tree grown for choose_action.
+#
+# Simplifications: the bot forgets what "Peek’ n see", "Whatcha u’ got of
+# there" and stolen cards showed it, and doesn't infer empty chambers from
+# earlier clicks.
+
+# -------- Legal Answers --------
+
+def legal_answers(game, player, method, args):
+    # Every distinct answer the bot considers for a decision.
+    hand = len(player.hand)
+    if method == "choose_action":
+        return ("p", "d", "n") if hand else ("d", "n")
+    if method == "choose_discards":
+        if hand > 5:
+            # Too many subsets; single cards, nothing or everything.
+            return ((),) + tuple((i,) for i in range(hand)) + (tuple(range(hand)),)
+        return tuple(tuple(i for i in range(hand) if bits >> i & 1) for bits in range(1 << hand))
+    if method in ("choose_play_after_discard", "choose_extra_play"):
+        return ("p", "n")
+    if method == "choose_card":
+        # With an empty hand the only answer is no card at all.
+        return tuple(range(hand)) or (None,)
+    if method == "choose_target":
+        return tuple(range(len(args[0])))
+    if method == "choose_focused_mode":
+        return ("k", "e")
+    if method == "choose_chamber":
+        return tuple(range(game.revolver.num_chambers))
+    raise ValueError(f"Unknown decision {method!r}")
+
+def as_reply(method, answer):
+    # Tree keys are hashable; Game expects a list of discard indices.
+    return list(answer) if method == "choose_discards" else answer
+
+# -------- Search Tree --------
+
+class Node:
+    __slots__ = ("visits", "wins", "avail", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.wins = 0.0
+        self.avail = 0        # Iterations in which this node's answer was legal.
+        self.children = {}    # (method, answer) -> Node
+
+    def merge(self, other):
+        # Adds another tree's statistics to this one (root-parallel search).
+        self.visits += other.visits
+        self.wins += other.wins
+        self.avail += other.avail
+        for key, child in other.children.items():
+            mine = self.children.get(key)
+            if mine is None:
+                self.children[key] = child
+            else:
+                mine.merge(child)
+        return self
+
+    def best(self, method, answers):
+        # Most visited child among the legal answers, or None if none was tried.
+        best, best_visits = None, 0
+        for answer in answers:
+            child = self.children.get((method, answer))
+            if child is not None and child.visits > best_visits:
+                best, best_visits = answer, child.visits
+        return best
+
+class TreeDecider:
+    # Plays the searching seat's decisions during one iteration: walks the
+    # tree during the root turn, then falls back to the rollout policy.
+    def __init__(self, root, round_count, rng, exploration):
+        self.node = root
+        self.path = [root]
+        self.round_count = round_count
+        self.rng = rng
+        self.exploration = exploration
+        self.rollout = RandomDecider(rng)
+        self.expanded = False
+
+    def decide(self, game, player, method, *args):
+        if self.expanded or game.round_count != self.round_count:
+            return getattr(self.rollout, method)(game, player, *args)
+        answers = legal_answers(game, player, method, args)
+        children = self.node.children
+        untried = []
+        for answer in answers:
+            child = children.get((method, answer))
+            if child is None or not child.visits:
+                untried.append(answer)
+        if untried:
+            # Expand one new answer, then roll out from there.
+            answer = self.rng.choice(untried)
+            self.expanded = True
+        else:
+            answer = max(answers, key=lambda a: self.ucb(children[(method, a)]))
+        for legal in answers:
+            child = children.get((method, legal))
+            if child is None:
+                child = children[(method, legal)] = Node()
+            child.avail += 1
+        self.node = children[(method, answer)]
+        self.path.append(self.node)
+        return as_reply(method, answer)
+
+    def ucb(self, child):
+        return child.wins / child.visits + self.exploration * math.sqrt(math.log(child.avail) / child.visits)
+
+    def choose_action(self, game, player):
+        return self.decide(game, player, "choose_action")
+
+    def choose_discards(self, game, player):
+        return self.decide(game, player, "choose_discards")
+
+    def choose_play_after_discard(self, game, player):
+        return self.decide(game, player, "choose_play_after_discard")
+
+    def choose_extra_play(self, game, player):
+        return self.decide(game, player, "choose_extra_play")
+
+    def choose_card(self, game, player):
+        return self.decide(game, player, "choose_card")
+
+    def choose_target(self, game, player, targets, prompt):
+        return self.decide(game, player, "choose_target", targets, prompt)
+
+    def choose_focused_mode(self, game, player):
+        return self.decide(game, player, "choose_focused_mode")
+
+    def choose_chamber(self, game, player):
+        return self.decide(game, player, "choose_chamber")
+
+# -------- Search --------
+
+def determinize(game, seat, rng, deciders):
+    # A clone of `game` with everything `seat` can't see resampled.
+    clone = game.clone(rng, deciders, NullPresenter())
+    others = [p for p in clone.active_players if p.seat != seat]
+    unseen = clone.deck.remaining_ids()
+    for p in others:
+        unseen.extend(card.card_id for card in p.hand)
+    rng.shuffle(unseen)
+    cards = CARDS.cards
+    start = 0
+    for p in others:
+        stop = start + len(p.hand)
+        p.hand = [cards[i] for i in unseen[start:stop]]
+        start = stop
+    clone.deck.order = unseen[start:]
+    clone.deck.position = 0
+    revolver = clone.revolver
+    revolver.mask = 0
+    for chamber in rng.sample(range(revolver.num_chambers), revolver.loaded):
+        revolver.mask |= 1 << chamber
+    return clone
+
+def search(game, seat, budget, rng, exploration=0.7, rollout_rounds=200, max_iterations=None):
+    # Runs ISMCTS from the start of `seat`'s turn for `budget` seconds (or
+    # max_iterations) and returns (root Node, rollouts played).
+    root = Node()
+    round_count = game.round_count
+    deadline = time.perf_counter() + budget
+    rollouts = 0
+    while time.perf_counter() < deadline and (max_iterations is None or rollouts < max_iterations):
+        tree = TreeDecider(root, round_count, rng, exploration)
+        deciders = [tree if p.seat == seat else RandomDecider(rng) for p in game.players]
+        clone = determinize(game, seat, rng, deciders)
+        # play() starts at the round after round_count; replay this one.
+        clone.round_count = round_count - 1
+        winner = clone.play(round_count + rollout_rounds)
+        if winner is not None:
+            reward = 1.0 if winner.seat == seat else 0.0
+        elif any(p.seat == seat for p in clone.active_players):
+            reward = 1.0 / len(clone.active_players)
+        else:
+            reward = 0.0
+        for node in tree.path:
+            node.visits += 1
+            node.wins += reward
+        rollouts += 1
+    return root, rollouts
+
+def search_worker(names, snapshot, template, num_chambers, hand_size, seat, budget, seed,
+                  exploration, rollout_rounds, max_iterations):
+    # One root-parallel search in a pool worker, on a game rebuilt from a snapshot.
+    rng = random.Random(seed)
+    game = Game.blank(names, [RandomDecider(rng) for _ in names], NullPresenter(), rng,
+                      num_chambers, template, hand_size=hand_size)
+    game.restore(snapshot)
+    return search(game, seat, budget, rng, exploration, rollout_rounds, max_iterations)
+
+# -------- Decider --------
+
+class MCTSDecider:
+    # Decider running ISMCTS for `budget` seconds per turn. With workers > 1
+    # the search is root-parallel: each worker grows its own tree from its
+    # own determinizations and the trees are summed. Pass any
+    # concurrent.futures executor, or a process pool is started on first use
+    # (threads only help on a free-threaded Python).
+    def __init__(self, budget=0.5, workers=1, executor=None, rng=None, exploration=0.7,
+                 rollout_rounds=200, max_iterations=None):
+        self.budget = budget
+        self.workers = workers
+        self.executor = executor
+        self.owns_executor = False
+        self.rng = rng if rng is not None else random.Random()
+        self.exploration = exploration
+        self.rollout_rounds = rollout_rounds
+        self.max_iterations = max_iterations
+        self.node = None            # Tree position within the current turn.
+        self.turn = None
+        # Running totals for tuning strength against latency.
+        self.rollouts = 0
+        self.search_seconds = 0.0
+        self.searches = 0
+        self.last_rollouts = 0
+        self.last_seconds = 0.0
+
+    def rollouts_per_sec(self):
+        return self.rollouts / self.search_seconds if self.search_seconds else 0.0
+
+    def report(self):
+        return (f"{self.searches} searches, {self.rollouts} rollouts in {self.search_seconds:.2f}s "
+                f"({self.rollouts_per_sec():,.0f} rollouts/sec)")
+
+    def search(self, game, player):
+        start = time.perf_counter()
+        if self.workers <= 1:
+            root, rollouts = search(game, player.seat, self.budget, self.rng, self.exploration,
+                                    self.rollout_rounds, self.max_iterations)
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(self.workers)
+                self.owns_executor = True
+            names = [p.name for p in game.players]
+            snapshot = game.snapshot()
+            futures = [self.executor.submit(search_worker, names, snapshot, game.deck.template,
+                                            game.revolver.num_chambers, game.hand_size,
+                                            player.seat, self.budget, self.rng.getrandbits(64),
+                                            self.exploration, self.rollout_rounds,
+                                            self.max_iterations)
+                       for _ in range(self.workers)]
+            root, rollouts = Node(), 0
+            for future in futures:
+                tree, count = future.result()
+                root.merge(tree)
+                rollouts += count
+        elapsed = time.perf_counter() - start
+        self.rollouts += rollouts
+        self.search_seconds += elapsed
+        self.searches += 1
+        self.last_rollouts = rollouts
+        self.last_seconds = elapsed
+        return root
+
+    def decide(self, game, player, method, *args):
+        answers = legal_answers(game, player, method, args)
+        if method == "choose_action":
+            self.node = self.search(game, player)
+            self.turn = game.round_count
+        answer = None
+        if self.node is not None and self.turn == game.round_count:
+            answer = self.node.best(method, answers)
+        if answer is None:
+            # Off the searched tree: nothing better to go on than chance.
+            self.node = None
+            answer = self.rng.choice(answers)
+        else:
+            self.node = self.node.children[(method, answer)]
+        return as_reply(method, answer)
+
+    def close(self):
+        if self.owns_executor:
+            self.executor.shutdown()
+            self.executor = None
+            self.owns_executor = False
+
+    def choose_action(self, game, player):
+        return self.decide(game, player, "choose_action")
+
+    def choose_discards(self, game, player):
+        return self.decide(game, player, "choose_discards")
+
+    def choose_play_after_discard(self, game, player):
+        return self.decide(game, player, "choose_play_after_discard")
+
+    def choose_extra_play(self, game, player):
+        return self.decide(game, player, "choose_extra_play")
+
+    def choose_card(self, game, player):
+        return self.decide(game, player, "choose_card")
+
+    def choose_target(self, game, player, targets, prompt):
+        return self.decide(game, player, "choose_target", targets, prompt)
+
+    def choose_focused_mode(self, game, player):
+        return self.decide(game, player, "choose_focused_mode")
+
+    def choose_chamber(self, game, player):
+        return self.decide(game, player, "choose_chamber")
+
+# -------- Main --------
+
+def main():
+    parser = argparse.ArgumentParser(description="Pit an MCTS bot in seat 0 against random bots.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--budget", type=float, default=0.1, help="search seconds per turn")
+    parser.add_argument("--workers", type=int, default=1, help="root-parallel search processes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    bot = MCTSDecider(args.budget, args.workers, rng=random.Random(args.seed))
+    names = [f"Bot {i + 1}" for i in range(args.players)]
+    wins = 0
+    try:
+        for i in range(args.games):
+            deciders = [bot] + [RandomDecider(rng) for _ in names[1:]]
+            winner = Game(names, deciders, NullPresenter(), rng).play(10000)
+            wins += winner is not None and winner.seat == 0
+            print(f"Game {i + 1}: {'won' if winner is not None and winner.seat == 0 else 'lost'}; "
+                  f"{wins}/{i + 1} won so far")
+    finally:
+        bot.close()
+    print(f"MCTS seat won {wins / args.games:.1%} of {args.games} games "
+          f"(random play wins about {1 / args.players:.0%})")
+    print(bot.report())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+import argparse
+import asyncio
+import random
+import resource
+import time
+
+from RussianROULETTED import Game
+from checkpoint import CheckpointStore
+from instrument import Instrumentation
+
+# asyncio game server: every table is a Game running play_async() as a task
+# on one event loop, with players connected over a line-based TCP protocol.
+#
+#   client -> server   JOIN <table> <name>
+#   server -> client   WELCOME <table> <seat>
+#   server -> client   SAY <text>                         game narration
+#   server -> client   ASK <seq> <method> <options> <prompt>
+#   client -> server   <seq> <answer>
+#   server -> client   END <winner name or ->
+#
+# Narration goes to every seat, except the lines Game tells one player only
+# (their hand, or a hand "Whatcha u’ got of there" revealed to them), which
+# go to that player's connection alone.
+#
+# <method> is a decider method name (choose_action, choose_card, ...) and
+# <options> the number of valid choices where that makes sense (cards in
+# hand, targets, chambers), else 0. Answers are what a player would type at
+# the console. A player who doesn't answer before their turn's deadline
+# auto-passes for the rest of that turn; replies with a stale <seq> are ignored.
+#
+# With a checkpoint directory, every table's game is checkpointed between
+# turns and a restarted server puts the unfinished ones back in the lobby.
+# Their players rejoin with the same table and name, and play resumes at
+# the turn where it stopped once every seat is back.
+
+# What an idle or disconnected player "answers".
+PASS_ANSWERS = {
+    "choose_action": "n",
+    "choose_discards": [],
+    "choose_play_after_discard": "n",
+    "choose_extra_play": "n",
+    "choose_card": None,
+    "choose_target": None,
+    "choose_focused_mode": "e",
+    "choose_chamber": None,
+}
+
+INT_METHODS = ("choose_card", "choose_target", "choose_chamber")
+
+def parse_answer(method, text):
+    # Same parsing as ConsoleDecider.
+    if method in INT_METHODS:
+        try:
+            return int(text)
+        except ValueError:
+            return None
+    if method == "choose_discards":
+        try:
+            return list(map(int, text.split()))
+        except ValueError:
+            return None
+    return text.strip().lower()
+
+def raise_fd_limit():
+    # Thousands of tables need thousands of sockets.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+# -------- Server Side --------
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.seq = 0
+        self.closed = False
+
+    def send(self, line):
+        if not self.closed:
+            self.writer.write(line.encode() + b"\n")
+
+    async def request(self, method, options, prompt, timeout):
+        # Sends an ASK and waits for its answer; PASS_ANSWERS[method] on timeout.
+        if self.closed or timeout <= 0:
+            return PASS_ANSWERS[method]
+        self.seq += 1
+        seq = str(self.seq)
+        self.send(f"ASK {seq} {method} {options} {prompt}")
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return PASS_ANSWERS[method]
+            try:
+                line = await asyncio.wait_for(self.reader.readline(), remaining)
+            except asyncio.TimeoutError:
+                return PASS_ANSWERS[method]
+            except ConnectionError:
+                line = b""
+            if not line:
+                self.closed = True
+                return PASS_ANSWERS[method]
+            reply_seq, _, answer = line.decode(errors="replace").rstrip("\r\n").partition(" ")
+            if reply_seq == seq:
+                return parse_answer(method, answer)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+class NetworkDecider:
+    # Decider for a remote player. Every method returns a coroutine, which
+    # Game.run_steps_async awaits. All decisions in one turn share one deadline.
+    def __init__(self, connection, turn_timeout):
+        self.connection = connection
+        self.turn_timeout = turn_timeout
+        self.turn = None
+        self.deadline = 0.0
+
+    def _ask(self, game, method, options, prompt):
+        now = asyncio.get_running_loop().time()
+        if self.turn != game.round_count:
+            self.turn = game.round_count
+            self.deadline = now + self.turn_timeout
+        return self.connection.request(method, options, prompt, self.deadline - now)
+
+    def choose_action(self, game, player):
+        return self._ask(game, "choose_action", 0, "Choose an action: (p)lay a card, (d)iscard to redraw, or (n)one:")
+
+    def choose_discards(self, game, player):
+        return self._ask(game, "choose_discards", len(player.hand), "Enter indices of cards to discard separated by spaces:")
+
+    def choose_play_after_discard(self, game, player):
+        return self._ask(game, "choose_play_after_discard", 0, "Now, do you want to play a card? (p)lay or (n)one:")
+
+    def choose_extra_play(self, game, player):
+        return self._ask(game, "choose_extra_play", 0, "You have an extra card play opportunity! (p)lay a card or (n)one:")
+
+    def choose_card(self, game, player):
+        return self._ask(game, "choose_card", len(player.hand), "Enter the index of the card to play:")
+
+    def choose_target(self, game, player, targets, prompt):
+        return self._ask(game, "choose_target", len(targets), prompt.strip())
+
+    def choose_focused_mode(self, game, player):
+        return self._ask(game, "choose_focused_mode", 0, "(k)ill a chosen player or gain an (e)xtra life? (k/e):")
+
+    def choose_chamber(self, game, player):
+        return self._ask(game, "choose_chamber", game.revolver.num_chambers, "Enter a chamber index to set as next:")
+
+class TablePresenter:
+    # Broadcasts narration to every seat and private lines to one; suspense
+    # becomes a non-blocking sleep.
+    def __init__(self, connections, pace, quiet):
+        self.connections = connections
+        self.pace = pace
+        self.quiet = quiet
+
+    def say(self, message):
+        if self.quiet:
+            return
+        for line in message.split("\n"):
+            for connection in self.connections:
+                connection.send(f"SAY {line}")
+
+    def tell(self, player, message):
+        if self.quiet:
+            return
+        connection = self.connections[player.seat]
+        for line in message.split("\n"):
+            connection.send(f"SAY {line}")
+
+    def pause(self, seconds):
+        return asyncio.sleep(seconds * self.pace)
+
+class Table:
+    def __init__(self, table_id, seats, game=None):
+        self.table_id = table_id
+        self.seats = seats
+        # A game restored from a checkpoint keeps its seating; new players
+        # can only take the seats of the names in it.
+        self.game = game
+        self.names = [p.name for p in game.players] if game is not None else []
+        self.connections = [None] * len(self.names)
+
+    def join(self, name, connection):
+        # Returns the player's seat, or None if there is none for them.
+        if self.game is None:
+            self.names.append(name)
+            self.connections.append(connection)
+            return len(self.connections) - 1
+        for seat, seated in enumerate(self.names):
+            if seated == name and self.connections[seat] is None:
+                self.connections[seat] = connection
+                return seat
+        return None
+
+    def full(self):
+        return len(self.connections) == self.seats and None not in self.connections
+
+    async def run(self, turn_timeout, pace, quiet, max_rounds, store=None):
+        deciders = [NetworkDecider(c, turn_timeout) for c in self.connections]
+        presenter = TablePresenter(self.connections, pace, quiet)
+        game = self.game
+        if game is None:
+            game = Game(self.names, deciders, presenter)
+        else:
+            game.presenter = presenter
+            for p, decider in zip(game.players, deciders):
+                p.decider = decider
+        if store is not None:
+            game.turn_hook = lambda game: store.save(self.table_id, game)
+        winner = await game.play_async(max_rounds)
+        if store is not None:
+            store.remove(self.table_id)
+        for connection in self.connections:
+            connection.send(f"END {winner.name if winner else '-'}")
+            connection.close()
+
+class GameServer:
+    def __init__(self, seats=2, turn_timeout=30.0, pace=1.0, quiet=False, max_rounds=10000,
+                 metrics_path=None, checkpoint_dir=None):
+        self.seats = seats
+        self.turn_timeout = turn_timeout
+        self.pace = pace
+        self.quiet = quiet
+        self.max_rounds = max_rounds
+        self.lobby = {}        # Table ID -> Table still waiting for players.
+        self.running = set()   # Tasks of tables in play.
+        self.tables_finished = 0
+        # With metrics_path, hot-path timings are rewritten there every 10 s.
+        self.metrics_path = metrics_path
+        self.instrumentation = Instrumentation().enable() if metrics_path else None
+        self.store = CheckpointStore(checkpoint_dir) if checkpoint_dir else None
+        self.tables_resumed = self.resume_tables() if self.store is not None else 0
+
+    def resume_tables(self):
+        # Puts every checkpointed game back in the lobby to wait for its players.
+        count = 0
+        for table_id in self.store.table_ids():
+            try:
+                game = self.store.load(table_id)
+            except (OSError, ValueError) as e:
+                print(f"Skipping checkpoint of table {table_id}: {e}")
+                continue
+            self.lobby[table_id] = Table(table_id, len(game.players), game)
+            count += 1
+        return count
+
+    async def handle_client(self, reader, writer):
+        connection = Connection(reader, writer)
+        line = (await reader.readline()).decode(errors="replace").split(maxsplit=2)
+        if len(line) < 3 or line[0] != "JOIN":
+            connection.send("ERROR expected: JOIN <table> <name>")
+            connection.close()
+            return
+        table_id, name = line[1], line[2].strip()
+        table = self.lobby.get(table_id)
+        if table is None:
+            table = self.lobby[table_id] = Table(table_id, self.seats)
+        seat = table.join(name, connection)
+        if seat is None:
+            connection.send(f"ERROR no free seat for {name} at table {table_id}")
+            connection.close()
+            return
+        connection.send(f"WELCOME {table_id} {seat}")
+        if table.full():
+            del self.lobby[table_id]
+            task = asyncio.create_task(self.run_table(table))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def run_table(self, table):
+        try:
+            await table.run(self.turn_timeout, self.pace, self.quiet, self.max_rounds, self.store)
+        finally:
+            for connection in table.connections:
+                connection.close()
+            self.tables_finished += 1
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port, backlog=4096)
+        print(f"Serving {self.seats}-seat tables on {host}:{port}")
+        if self.tables_resumed:
+            print(f"{self.tables_resumed} checkpointed tables waiting for their players")
+        async with server:
+            while True:
+                await asyncio.sleep(10)
+                print(f"{len(self.running)} tables playing, {len(self.lobby)} waiting, "
+                      f"{self.tables_finished} finished")
+                if self.instrumentation is not None:
+                    self.instrumentation.write_prometheus(self.metrics_path)
+
+# -------- Load Generator --------
+
+class LoadStats:
+    def __init__(self):
+        self.latencies = []    # Seconds from a reply to the table's next ASK.
+        self.games = 0
+        self.errors = 0
+
+    def percentile(self, q):
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def bot_answer(rng, method, options):
+    if method == "choose_action":
+        return rng.choice("ppdn")
+    if method == "choose_discards":
+        return " ".join(str(i) for i in range(options) if rng.random() < 0.5)
+    if method in ("choose_play_after_discard", "choose_extra_play"):
+        return rng.choice("pn")
+    if method == "choose_focused_mode":
+        return rng.choice("ke")
+    return str(rng.randrange(options)) if options else ""
+
+async def bot_player(host, port, table_id, seat, table_clock, stats, rng, connect_slots):
+    # One bot seat. table_clock[0] holds when anyone at the table last replied.
+    async with connect_slots:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"JOIN {table_id} bot{seat}\n".encode())
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                stats.errors += 1
+                return
+            kind, _, rest = line.decode().rstrip("\n").partition(" ")
+            if kind == "ASK":
+                now = time.perf_counter()
+                if table_clock[0] is not None:
+                    stats.latencies.append(now - table_clock[0])
+                seq, method, options, _ = (rest.split(" ", 3) + [""])[:4]
+                writer.write(f"{seq} {bot_answer(rng, method, int(options))}\n".encode())
+                table_clock[0] = time.perf_counter()
+            elif kind == "END":
+                if seat == 0:
+                    stats.games += 1
+                return
+    finally:
+        writer.close()
+
+async def run_load(host, port, tables, seats, seed, max_connects):
+    stats = LoadStats()
+    rng = random.Random(seed)
+    connect_slots = asyncio.Semaphore(max_connects)
+    tasks = []
+    start = time.perf_counter()
+    for t in range(tables):
+        clock = [None]
+        table_id = f"load{seed}-{t}"
+        for seat in range(seats):
+            tasks.append(bot_player(host, port, table_id, seat, clock, stats,
+                                    random.Random(rng.random()), connect_slots))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    print(f"{stats.games} games at {tables} concurrent tables in {elapsed:.1f}s "
+          f"({len(stats.latencies)} decisions, {stats.errors} dropped connections)")
+    for label, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0)):
+        print(f"  turn latency {label}: {stats.percentile(q) * 1000:.2f} ms")
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-table Russian Roulette server and load generator.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=7777)
+    serve.add_argument("--seats", type=int, default=2)
+    serve.add_argument("--turn-timeout", type=float, default=30.0)
+    serve.add_argument("--pace", type=float, default=1.0, help="suspense delay multiplier (0 = none)")
+    serve.add_argument("--quiet", action="store_true", help="don't send SAY narration")
+    serve.add_argument("--metrics", metavar="PATH", help="write hot-path timings here (Prometheus text)")
+    serve.add_argument("--checkpoint-dir", metavar="DIR",
+                       help="checkpoint tables here between turns and resume them on restart")
+    load = sub.add_parser("load")
+    load.add_argument("--host", default="127.0.0.1")
+    load.add_argument("--port", type=int, default=7777)
+    load.add_argument("--tables", type=int, default=5000)
+    load.add_argument("--seats", type=int, default=2)
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--max-connects", type=int, default=500, help="connection attempts in flight")
+    args = parser.parse_args()
+    raise_fd_limit()
+    if args.command == "serve":
+        server = GameServer(args.seats, args.turn_timeout, args.pace, args.quiet,
+                            metrics_path=args.metrics, checkpoint_dir=args.checkpoint_dir)
+        asyncio.run(server.serve(args.host, args.port))
+    else:
+        asyncio.run(run_load(args.host, args.port, args.tables, args.seats, args.seed, args.max_connects))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,609 @@
+from array import array
+from collections import OrderedDict, namedtuple
+from itertools import combinations
+from math import comb
+
+from RussianROULETTED import CARDS
+
+# Exact win probabilities for a Game position by expectimax over the revolver
+# endgame. Each player to move picks the action that maximises their own
+# chance of being last standing; trigger pulls, peeks and steals are chance
+# nodes.
+#
+# Nobody at the table can see the cylinder, so players choose without
+# knowing where the bullets are, but the gun fires by where they really
+# are. The solver keeps both. Players decide from the public belief about
+# the revolver: a distribution over (chamber mask, current chamber) pairs.
+# It starts with every arrangement of the game's loaded bullets at every
+# cylinder position equally likely, which is exactly what everyone knows at
+# a fresh deal, and is updated by what the table sees from there on: clicks
+# and bangs, "Peek’ n see" (read out to everyone), "Master of fate" and
+# respins. Adding or removing a bullet changes the count, which is public,
+# but not where it went. A position handed in mid-game starts from that
+# same uniform belief, so anything the players learnt earlier in the game
+# is forgotten. Chance, on the other hand, is resolved against each
+# arrangement separately: a position is solved for every arrangement in its
+# belief at once, with the action the mover would pick on average, and
+# solve_game reads off the odds for the revolver the game actually holds.
+#
+# The hands, on the other hand, are treated as face up: every player sees
+# every card in hand. Odds are therefore those of a game where only the
+# revolver is hidden.
+#
+# What else the solver models: the cards already in hand (hands are not
+# refilled, since refills depend on the unknown deck order), every
+# per-player flag that changes the outcome of a pull, and the same
+# turn-order rules as Game.play. Cards whose effect depends on future draws
+# or on play history ("Domain Expansion: Casino", "Let’s go gambling",
+# "Ambidextrous", "Anotha’ time") are never played, and "Whatcha u’ got of
+# there" shows nothing that isn't already known here.
+#
+# The state space grows steeply with the cards in hand: a 2-player deal
+# solves in a few seconds at most, a 3-player one in tens of seconds to a
+# few minutes when it solves at all, and a 4-player one not at all.
+# solve_game refuses positions with more than MAX_HAND_CARDS cards in hand
+# with a ValueError, and so does the solver as soon as a belief would hold
+# more than MAX_ARRANGEMENTS revolver arrangements, or after expanding
+# max_states positions (a few minutes' work by default) rather than run for
+# hours.
+
+MAX_HAND_CARDS = 12
+MAX_ARRANGEMENTS = 4096
+
+# -------- Canonical State --------
+
+# One seat's outcome-relevant state. hand is a sorted tuple of card IDs.
+SeatState = namedtuple("SeatState", "hand safe extra_life pending forced block")
+
+# A whole position. belief is the public distribution over the revolver, a
+# sorted tuple of ((mask, chamber), probability). order lists the active
+# seats in turn order, idx is the seat to move's position in it, and idle
+# counts consecutive turns with an empty gun and no card played (used to end
+# stalemates).
+SolverState = namedtuple("SolverState", "belief order idx seats idle")
+
+# What state_from_game returns: the true revolver (chamber mask and current
+# chamber) and the public position around it.
+GameKey = namedtuple("GameKey", "mask chamber state")
+
+EMPTY_SEAT = SeatState((), False, False, 0, False, False)
+
+RESPIN = CARDS.card_id("Respin")
+FOCUSED_ACTION = CARDS.card_id("Focused action")
+PEEK = CARDS.card_id("Peek’ n see")
+GIMME_THOSE = CARDS.card_id("Gimme those")
+NOPE = CARDS.card_id("Nope")
+JUST_1_MORE = CARDS.card_id("Just 1 more")
+BULLETS = CARDS.card_id("Bullets!!!")
+GET_THAT_OUT = CARDS.card_id("Get that out of here")
+ANOTHER_JUST_FOR_YOU = CARDS.card_id("Another just for you")
+AND_YOU_GET_A_BULLET = CARDS.card_id("And you get a bullet and you get a bullet and you….")
+YOU_OWE_ME = CARDS.card_id("You owe me…")
+CANT_TOUCH_THIS = CARDS.card_id("Can’t touch this")
+REVERSE = CARDS.card_id("Reverse")
+MASTER_OF_FATE = CARDS.card_id("Master of fate")
+NO_BALLS = CARDS.card_id("No balls")
+ENHANCED_NOPE = CARDS.card_id("Enhanced nope")
+GIVE_JIMMY = CARDS.card_id("Give Jimmy a chance")
+TAKE_THIS = CARDS.card_id("I think I’ll be take this")
+
+PENDING_CARDS = {ANOTHER_JUST_FOR_YOU: 1, AND_YOU_GET_A_BULLET: 2, YOU_OWE_ME: -1}
+
+def public_belief(num_chambers, loaded):
+    # Every arrangement of `loaded` bullets at every cylinder position,
+    # equally likely.
+    masks = [sum(1 << c for c in chambers) for chambers in combinations(range(num_chambers), loaded)]
+    p = 1 / (len(masks) * num_chambers)
+    return tuple(sorted(((mask, chamber), p) for mask in masks for chamber in range(num_chambers)))
+
+def state_from_game(game):
+    # Canonical, hashable key for the current position of `game`: the true
+    # revolver plus the public position the players choose from. Raises
+    # ValueError if the revolver has too many possible arrangements to track.
+    revolver = game.revolver
+    arrangements = comb(revolver.num_chambers, revolver.loaded) * revolver.num_chambers
+    if arrangements > MAX_ARRANGEMENTS:
+        raise ValueError(f"Position too large to solve: {arrangements} possible revolver "
+                         f"arrangements (at most {MAX_ARRANGEMENTS})")
+    order = game.turn_order
+    seats = []
+    for p in game.players:
+        if not order.is_active(p):
+            seats.append(EMPTY_SEAT)
+            continue
+        seats.append(SeatState(
+            tuple(sorted(card.card_id for card in p.hand)),
+            bool(p.safe_trigger),
+            p.extra_life_rounds > 0,   # Only whether an extra life is left matters.
+            p.pending_bullet_modifier,
+            bool(p.forced_extra_turn),
+            bool(p.block_active),
+        ))
+    state = SolverState(public_belief(revolver.num_chambers, revolver.loaded),
+                        tuple(p.seat for p in order.in_order()), 0, tuple(seats), 0)
+    return GameKey(revolver.mask, revolver.current_chamber, state)
+
+# -------- Solver --------
+
+class Solver:
+    def __init__(self, num_seats, num_chambers=6, max_table_size=1_000_000, max_states=1_000_000):
+        self.num_seats = num_seats
+        self.num_chambers = num_chambers
+        self.full_mask = (1 << num_chambers) - 1
+        self.max_table_size = max_table_size
+        self.max_states = max_states  # Positions to expand before giving up.
+        self.table = OrderedDict()  # LRU transposition table: state -> values.
+        self.beliefs = {}   # (update, belief, argument) -> result; few beliefs recur a lot.
+        self.identities = {}    # Belief size -> moves that leave every arrangement in place.
+        self.hits = 0
+        self.misses = 0
+        self.no_winner = (0.0,) * num_seats
+
+    def value(self, key):
+        # Tuple of win probabilities, one per seat, with best play from the
+        # position `key` (see state_from_game).
+        values = self.values(key.state)
+        i = self._index(key)
+        return tuple(values[i * self.num_seats:(i + 1) * self.num_seats])
+
+    def values(self, state):
+        # Win probabilities with best play from `state`, for every revolver
+        # arrangement in its belief: a flat array, num_seats values per
+        # arrangement in belief order. Depth-first with an explicit stack,
+        # since a line of play can be longer than Python's recursion limit.
+        # Raises ValueError after expanding max_states positions.
+        table = self.table
+        cached = table.get(state)
+        if cached is not None:
+            self.hits += 1
+            table.move_to_end(state)
+            return cached
+        stack = [state]
+        nodes = {}  # State -> (seat to move, actions), for states on the current path.
+        while stack:
+            state = stack[-1]
+            node = nodes.get(state)
+            if node is None:
+                if state in table:
+                    # Pushed twice and solved since.
+                    stack.pop()
+                    continue
+                self.misses += 1
+                if self.misses > self.max_states:
+                    raise ValueError(f"Position too large to solve: gave up after "
+                                     f"{self.max_states} positions")
+                node = nodes[state] = self._node(state)
+            seat, actions = node
+            if seat is None:
+                # Terminal: the same values whatever the revolver holds.
+                values = array('d', actions * len(state.belief))
+            else:
+                missing = [child for _, outcomes in actions for child, _ in outcomes
+                           if type(child) is SolverState and child not in table]
+                if missing:
+                    for child in missing:
+                        if child in nodes:
+                            raise RuntimeError("Solver reached a position from itself")
+                    stack.extend(missing)
+                    continue
+                values = array('d', self._best(seat, actions, state.belief)[1])
+            table[state] = values
+            if len(table) > self.max_table_size:
+                table.popitem(last=False)
+            del nodes[state]
+            stack.pop()
+        return table[state]
+
+    def best_action(self, key):
+        # (label, values) for the mover's best choice from the position
+        # `key`; label is "pass" or a description of the card play, and the
+        # values are for the revolver `key` holds.
+        state = key.state
+        seat, actions = self._node(state)
+        if seat is None:
+            return None
+        for _, outcomes in actions:
+            for child, _ in outcomes:
+                if type(child) is SolverState:
+                    self.values(child)
+        label, values = self._best(seat, actions, state.belief)
+        i = self._index(key)
+        return label, tuple(values[i * self.num_seats:(i + 1) * self.num_seats])
+
+    def _index(self, key):
+        # Position of the key's true revolver in its belief.
+        arrangement = (key.mask, key.chamber)
+        for i, (entry, _) in enumerate(key.state.belief):
+            if entry == arrangement:
+                return i
+        raise ValueError("The revolver does not match the position's belief")
+
+    def _best(self, seat, actions, belief):
+        # (label, values) of the action the mover rates highest. The mover
+        # can't see the revolver, so actions are compared by the mover's
+        # chances averaged over the belief, and only the chosen one is worked
+        # out for every seat and arrangement. Near-ties go to the earlier
+        # action, so rounding can't flip a choice.
+        table = self.table
+        num_seats = self.num_seats
+        weights = [p for _, p in belief]
+        best = None
+        for label, outcomes in actions:
+            score = 0.0
+            for child, moves in outcomes:
+                if type(child) is SolverState:
+                    values = table[child]
+                    for p, row in zip(weights, moves):
+                        for q, j in row:
+                            score += p * q * values[j * num_seats + seat]
+                elif child[seat]:
+                    for p, row in zip(weights, moves):
+                        for q, _ in row:
+                            score += p * q * child[seat]
+            if best is None or score > best[0] + 1e-9:
+                best = score, label, outcomes
+        return best[1], self._expect(best[2], len(belief))
+
+    def _expect(self, outcomes, size):
+        # Values of one action for each of `size` arrangements: the
+        # probability-weighted sum of its solved outcomes.
+        table = self.table
+        num_seats = self.num_seats
+        seats = range(num_seats)
+        total = [0.0] * (size * num_seats)
+        for child, moves in outcomes:
+            terminal = type(child) is not SolverState
+            if terminal:
+                values = child
+            else:
+                self.hits += 1
+                values = table[child]
+            base = 0
+            for row in moves:
+                for q, j in row:
+                    offset = 0 if terminal else j * num_seats
+                    for s in seats:
+                        total[base + s] += q * values[offset + s]
+                base += num_seats
+        return total
+
+    def _node(self, state):
+        # (None, values) for a finished position, else (seat to move,
+        # [(label, [(next state or values, moves), ...]), ...]). moves[i]
+        # lists (probability, index in the next state's belief) for
+        # arrangement i of this state's belief.
+        if len(state.order) == 1:
+            values = [0.0] * self.num_seats
+            values[state.order[0]] = 1.0
+            return None, tuple(values)
+        if not state.order:
+            return None, self.no_winner
+        if state.idle >= len(state.order) * self.num_chambers:
+            # Nobody will load the gun again; the table stalls without a winner.
+            return None, self.no_winner
+        seat = state.order[state.idx]
+        pending = state.seats[seat].pending
+        if pending:
+            # Pending modifiers resolve at the start of the turn.
+            seats = self._with_seat(state.seats, seat, pending=0)
+            belief, moves = self._update("modify", state.belief, pending)
+            idle = 0 if self._loaded(belief) else state.idle
+            return seat, [("pending", [(state._replace(belief=belief, seats=seats, idle=idle), moves)])]
+        return seat, self._actions(state)
+
+    # -------- Actions --------
+
+    def _actions(self, state):
+        seat = state.order[state.idx]
+        actions = [("pass", self._after_play(state, "trigger", seat, played=False))]
+        for card_id in sorted(set(state.seats[seat].hand)):
+            hand = list(state.seats[seat].hand)
+            hand.remove(card_id)
+            base = state._replace(seats=self._with_seat(state.seats, seat, hand=tuple(hand)))
+            for label, outcomes in self._card_outcomes(base, seat, card_id):
+                actions.append((label, [(child, self._compose(moves, after))
+                                        for next_state, outcome, moves in outcomes
+                                        for child, after in self._after_play(next_state, outcome, seat, played=True)]))
+        return actions
+
+    def _card_outcomes(self, state, seat, card_id):
+        # Yields (label, [(state, "trigger" | "end", moves), ...]) for every
+        # way the mover can play card_id. "end" means the turn ends without the
+        # mover pulling the trigger ("Nope" and "Give Jimmy a chance").
+        name = CARDS.types[card_id].name
+        seats = state.seats
+        belief = state.belief
+        same = self._identity(len(belief))
+        others = [s for s in state.order if s != seat]
+        if card_id == RESPIN:
+            after, moves = self._update("respin", belief, None)
+            yield name, [(state._replace(belief=after), "trigger", moves)]
+        elif card_id == PEEK:
+            yield name, [(state._replace(belief=after), "trigger", moves)
+                         for _, after, moves in self._update("split", belief, False)]
+        elif card_id == NOPE:
+            yield name, [(state, "end", same)]
+        elif card_id in (JUST_1_MORE, BULLETS, GET_THAT_OUT):
+            shots = {JUST_1_MORE: 1, BULLETS: 2, GET_THAT_OUT: -1}[card_id]
+            after, moves = self._update("modify", belief, shots)
+            yield name, [(state._replace(belief=after), "trigger", moves)]
+        elif card_id == CANT_TOUCH_THIS:
+            yield name, [(state._replace(seats=self._with_seat(seats, seat, safe=True)), "trigger", same)]
+        elif card_id == ENHANCED_NOPE:
+            yield name, [(state._replace(seats=self._with_seat(seats, seat, block=True)), "trigger", same)]
+        elif card_id == REVERSE:
+            order = state.order[::-1]
+            yield name, [(state._replace(order=order, idx=order.index(seat)), "trigger", same)]
+        elif card_id == MASTER_OF_FATE:
+            for c in range(self.num_chambers):
+                after, moves = self._update("set", belief, c)
+                yield f"{name} -> chamber {c}", [(state._replace(belief=after), "trigger", moves)]
+        elif card_id == NO_BALLS:
+            target = state.order[(state.idx + 1) % len(state.order)]
+            yield name, [(state._replace(seats=self._with_seat(seats, target, forced=True)), "trigger", same)]
+        elif card_id == FOCUSED_ACTION:
+            yield f"{name} (extra life)", [(state._replace(seats=self._with_seat(seats, seat, extra_life=True)),
+                                            "trigger", same)]
+            for target, blocked_state in self._targets(state, others):
+                if blocked_state is not None:
+                    yield f"{name} (kill seat {target})", [(blocked_state, "trigger", same)]
+                else:
+                    yield f"{name} (kill seat {target})", [(self._eliminate(state, target), "trigger", same)]
+            if not others:
+                yield f"{name} (kill)", [(state, "trigger", same)]
+        elif card_id in PENDING_CARDS or card_id in (GIMME_THOSE, GIVE_JIMMY, TAKE_THIS):
+            if not others:
+                yield name, [(state, "trigger", same)]
+            for target, blocked_state in self._targets(state, others):
+                label = f"{name} -> seat {target}"
+                if blocked_state is not None:
+                    yield label, [(blocked_state, "trigger", same)]
+                elif card_id in PENDING_CARDS:
+                    pending = seats[target].pending + PENDING_CARDS[card_id]
+                    yield label, [(state._replace(seats=self._with_seat(seats, target, pending=pending)),
+                                   "trigger", same)]
+                elif card_id == GIMME_THOSE:
+                    swapped = self._with_seat(seats, seat, hand=seats[target].hand)
+                    swapped = self._with_seat(swapped, target, hand=seats[seat].hand)
+                    yield label, [(state._replace(seats=swapped), "trigger", same)]
+                elif card_id == GIVE_JIMMY:
+                    yield label, [(next_state, "end", moves)
+                                  for next_state, moves in self._forced_pull(state, target)]
+                else:
+                    yield label, self._steal_outcomes(state, seat, target)
+
+    def _targets(self, state, others):
+        # (target seat, state after "Enhanced nope" blocked it or None) pairs.
+        for target in others:
+            if state.seats[target].block:
+                yield target, state._replace(seats=self._with_seat(state.seats, target, block=False))
+            else:
+                yield target, None
+
+    def _steal_outcomes(self, state, seat, target):
+        # The stolen card is picked at random, whatever the revolver holds.
+        hand = state.seats[target].hand
+        size = len(state.belief)
+        if not hand:
+            return [(state, "trigger", self._identity(size))]
+        outcomes = []
+        for card_id in sorted(set(hand)):
+            theirs = list(hand)
+            theirs.remove(card_id)
+            mine = tuple(sorted(state.seats[seat].hand + (card_id,)))
+            seats = self._with_seat(state.seats, target, hand=tuple(theirs))
+            seats = self._with_seat(seats, seat, hand=mine)
+            q = hand.count(card_id) / len(hand)
+            outcomes.append((state._replace(seats=seats), "trigger", tuple(((q, i),) for i in range(size))))
+        return outcomes
+
+    # -------- Turn Resolution --------
+
+    def _after_play(self, state, outcome, mover, played):
+        # Finishes the mover's turn the way Game.play does: [(next state or
+        # values, moves), ...].
+        if outcome == "end":
+            # After "skip"/"forced" Game.play goes straight to the next player.
+            return [(state._replace(idx=(state.idx + 1) % len(state.order), idle=0),
+                     self._identity(len(state.belief)))]
+        results = []
+        for belief, moves, seats, eliminated in self._pull(state.belief, state.seats, mover):
+            if not eliminated and seats[mover].forced:
+                seats = self._with_seat(seats, mover, forced=False)
+                for again, again_moves, again_seats, again_eliminated in self._pull(belief, seats, mover):
+                    results.append((self._end_turn(state, again, again_seats, again_eliminated, mover, played),
+                                    self._compose(moves, again_moves)))
+            else:
+                results.append((self._end_turn(state, belief, seats, eliminated, mover, played), moves))
+        return results
+
+    def _end_turn(self, state, belief, seats, eliminated, mover, played):
+        # The mover sits at idx (card eliminations keep it pointing at them).
+        order = list(state.order)
+        idx = state.idx
+        if eliminated:
+            # The turn passes to whoever sat after them.
+            order.pop(idx)
+            seats = self._with_seat(seats, mover, EMPTY_SEAT)
+            if not order:
+                return self.no_winner
+            return SolverState(belief, tuple(order), idx % len(order), seats, 0)
+        seats = self._with_seat(seats, mover, safe=False)
+        idle = 0 if played or self._loaded(belief) else state.idle + 1
+        return SolverState(belief, state.order, (idx + 1) % len(order), seats, idle)
+
+    def _pull(self, belief, seats, seat):
+        # Mirrors Game.resolve_trigger: [(belief, moves, seats, eliminated), ...].
+        # Whether it fires is decided by the arrangement, so each one moves
+        # to exactly one of the outcomes.
+        outcomes = []
+        for fired, after, moves in self._update("split", belief, True):
+            if not fired:
+                outcomes.append((after, moves, seats, False))
+            elif seats[seat].safe:
+                outcomes.append((after, moves, self._with_seat(seats, seat, safe=False), False))
+            elif seats[seat].extra_life:
+                outcomes.append((after, moves, self._with_seat(seats, seat, extra_life=False), False))
+            else:
+                outcomes.append((after, moves, seats, True))
+        return outcomes
+
+    def _forced_pull(self, state, target):
+        # "Give Jimmy a chance": the target pulls instead of the mover.
+        outcomes = []
+        for belief, moves, seats, eliminated in self._pull(state.belief, state.seats, target):
+            next_state = state._replace(belief=belief, seats=seats)
+            outcomes.append((self._eliminate(next_state, target) if eliminated else next_state, moves))
+        return outcomes
+
+    def _eliminate(self, state, target):
+        # Mirrors Game.eliminate: the turn stays with the mover.
+        order = list(state.order)
+        mover = order[state.idx]
+        order.remove(target)
+        idx = order.index(mover)
+        seats = self._with_seat(state.seats, target, EMPTY_SEAT)
+        return state._replace(order=tuple(order), idx=idx, seats=seats)
+
+    # -------- Revolver Beliefs --------
+
+    # Every update returns the new belief with its moves: for each
+    # arrangement of the old belief, the (probability, index) pairs of the
+    # arrangements it becomes in the new one.
+
+    def _belief(self, dist):
+        # Canonical belief from {(mask, chamber): weight}, and where each
+        # arrangement of `dist` ended up in it. Chamber numbers are only
+        # labels, so a belief and its rotations lead to the same odds; the
+        # smallest rotation stands for all of them. Rounding lets beliefs
+        # reached by different routes share a table entry.
+        if len(dist) > MAX_ARRANGEMENTS:
+            raise ValueError(f"Position too large to solve: {len(dist)} possible revolver "
+                             f"arrangements (at most {MAX_ARRANGEMENTS})")
+        total = sum(dist.values()) or 1.0
+        n = self.num_chambers
+        full = self.full_mask
+        best = None
+        for r in range(n):
+            rotated = sorted(
+                ((((mask << r) | (mask >> (n - r))) & full, (chamber + r) % n), round(w / total, 12),
+                 (mask, chamber))
+                for (mask, chamber), w in dist.items())
+            belief = tuple(entry[:2] for entry in rotated)
+            if best is None or belief < best[0]:
+                best = belief, rotated
+        belief, rotated = best
+        return belief, {entry[2]: i for i, entry in enumerate(rotated)}
+
+    def _update(self, kind, belief, argument):
+        # Memoised belief update: kind is "split", "respin", "set" or "modify".
+        key = (kind, belief, argument)
+        result = self.beliefs.get(key)
+        if result is None:
+            if kind == "split":
+                result = self._split(belief, argument)
+            elif kind == "respin":
+                n = self.num_chambers
+                result = self._transform(
+                    belief, lambda mask, chamber: [(1 / n, (mask, c)) for c in range(n)])
+            elif kind == "set":
+                result = self._transform(belief, lambda mask, chamber: [(1.0, (mask, argument))])
+            else:
+                result = self._transform(
+                    belief, lambda mask, chamber: [(q, (m, chamber))
+                                                   for m, q in self._modified_masks(mask, argument)])
+            self.beliefs[key] = result
+        return result
+
+    @staticmethod
+    def _loaded(belief):
+        # Bullets in the gun; every arrangement in a belief has the same count.
+        return belief[0][0][0].bit_count()
+
+    def _split(self, belief, advance):
+        # What the table sees of the current chamber: [(loaded?, belief given
+        # that, moves), ...]. An arrangement only moves on the side it is on.
+        # advance turns the cylinder on, as a pull does.
+        n = self.num_chambers
+        sides = ([], [])
+        for i, ((mask, chamber), p) in enumerate(belief):
+            sides[mask >> chamber & 1].append((i, (mask, (chamber + 1) % n if advance else chamber), p))
+        result = []
+        for loaded in (1, 0):
+            side = sides[loaded]
+            if not side:
+                continue
+            after, index = self._belief({arrangement: p for _, arrangement, p in side})
+            moves = [()] * len(belief)
+            for i, arrangement, _ in side:
+                moves[i] = ((1.0, index[arrangement]),)
+            result.append((bool(loaded), after, tuple(moves)))
+        return result
+
+    def _transform(self, belief, step):
+        # Applies step(mask, chamber) -> [(probability, (mask, chamber)), ...]
+        # to every arrangement.
+        dist = {}
+        targets = []
+        for (mask, chamber), p in belief:
+            out = step(mask, chamber)
+            targets.append(out)
+            for q, arrangement in out:
+                dist[arrangement] = dist.get(arrangement, 0.0) + p * q
+        after, index = self._belief(dist)
+        return after, tuple(tuple((q, index[arrangement]) for q, arrangement in out) for out in targets)
+
+    def _modified_masks(self, mask, shots):
+        # Distribution of chamber masks after |shots| random adds (shots > 0) or
+        # removes (shots < 0), each picking uniformly like Revolver does.
+        dist = {mask: 1.0}
+        for _ in range(abs(shots)):
+            step = {}
+            for m, p in dist.items():
+                candidates = ~m & self.full_mask if shots > 0 else m
+                count = candidates.bit_count()
+                if not count:
+                    step[m] = step.get(m, 0.0) + p
+                    continue
+                while candidates:
+                    bit = candidates & -candidates
+                    candidates ^= bit
+                    nm = m ^ bit
+                    step[nm] = step.get(nm, 0.0) + p / count
+            dist = step
+        return sorted(dist.items())
+
+    # -------- Helpers --------
+
+    def _identity(self, size):
+        moves = self.identities.get(size)
+        if moves is None:
+            moves = self.identities[size] = tuple(((1.0, i),) for i in range(size))
+        return moves
+
+    def _compose(self, first, second):
+        # Moves of `first` followed by those of `second`.
+        if self.identities.get(len(first)) is first:
+            return second
+        if self.identities.get(len(second)) is second:
+            return first
+        return tuple(tuple((q * r, k) for q, j in row for r, k in second[j]) for row in first)
+
+    @staticmethod
+    def _with_seat(seats, seat, replacement=None, **changes):
+        seat_state = replacement if replacement is not None else seats[seat]._replace(**changes)
+        return seats[:seat] + (seat_state,) + seats[seat + 1:]
+
+def solve_game(game, max_table_size=1_000_000, max_states=1_000_000):
+    # P(win) for each player of `game` from its current position and
+    # revolver, with players choosing as if the revolver were hidden and
+    # hands face up (see the top of this file). Raises ValueError for
+    # positions too large to solve.
+    key = state_from_game(game)
+    cards = sum(len(seat.hand) for seat in key.state.seats)
+    if cards > MAX_HAND_CARDS:
+        raise ValueError(f"Position too large to solve: {cards} cards in hand "
+                         f"(at most {MAX_HAND_CARDS})")
+    solver = Solver(len(game.players), game.revolver.num_chambers, max_table_size, max_states)
+    values = solver.value(key)
+    return {p.name: v for p, v in zip(game.players, values)}
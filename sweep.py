@@ -0,0 +1,252 @@
+import argparse
+import csv
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from RussianROULETTED import CARDS, Deck, Game, NullPresenter, game_seed
+from tournament import make_decider
+
+# Parameter sweeps for balance tuning, with common random numbers:
+#
+#   python sweep.py --games 2000 --chambers 6,8 --hand-size 3,4,5 \
+#       --card "Respin=4,2,6" --card "Bullets!!!=4,2" --workers 8
+#
+# Every combination of the listed values is one configuration, and the first
+# value of each list makes up the baseline. Cards not listed keep their
+# registered counts.
+#
+# Game i of every configuration draws from the same random streams: one per
+# card type for deck shuffles, one for the table (revolver and random card
+# effects) and one per seat for that bot's choices. Keeping them separate
+# means a change that consumes one stream differently leaves the others in
+# step, so matched games stay alike for as long as the rules let them. In
+# particular a shuffle sorts the copies of each card on keys drawn from that
+# card's stream (see CommonDeck), so adding copies of one card slots them in
+# between the others without reordering them. Comparing configurations game
+# by game then cancels the noise they still share: each row's "vs base"
+# column is the mean paired difference from the baseline, whose confidence
+# interval is narrower than that of two independent samples by however much
+# the matched games stay alike. "x" is that variance reduction, i.e. how
+# many times more games independent sampling would need.
+#
+# Intervals are normal approximations at 95%. Games are played in fixed
+# shards, so results don't depend on the number of workers.
+
+Z_95 = 1.959964
+SHARD_SIZE = 500
+
+# Per-game outcomes, named for the results table: (label, function(winner
+# seat or -1, rounds) -> value, percentage?).
+METRICS = [
+    ("rounds", lambda winner, rounds: rounds, False),
+    ("seat 1 wins", lambda winner, rounds: winner == 0, True),
+    ("no winner", lambda winner, rounds: winner < 0, True),
+]
+
+# -------- Configurations --------
+
+class Config:
+    __slots__ = ("counts", "num_chambers", "hand_size")
+
+    def __init__(self, counts, num_chambers=6, hand_size=4):
+        self.counts = dict(counts)   # Card name -> copies in the deck.
+        self.num_chambers = num_chambers
+        self.hand_size = hand_size
+
+    def template(self):
+        return CARDS.template(self.counts)
+
+    def label(self, varied_cards=()):
+        parts = [f"chambers={self.num_chambers}", f"hand={self.hand_size}"]
+        parts.extend(f"{name}={self.counts[name]}" for name in varied_cards)
+        return " ".join(parts)
+
+def default_counts():
+    return {card_type.name: card_type.count for card_type in CARDS.types}
+
+def build_grid(chambers=(6,), hand_sizes=(4,), card_counts=()):
+    # card_counts is [(card name, [counts])]. Returns configurations with the
+    # baseline (every list's first value) first.
+    configs = []
+    names = [name for name, _ in card_counts]
+    for values in itertools.product(chambers, hand_sizes, *[counts for _, counts in card_counts]):
+        counts = default_counts()
+        counts.update(zip(names, values[2:]))
+        configs.append(Config(counts, values[0], values[1]))
+    return configs
+
+# -------- Games --------
+
+class CommonDeck(Deck):
+    # Deck whose shuffle only depends on each card type's own stream of keys.
+    def __init__(self, seed, template):
+        self.seed = seed
+        self.streams = {}    # Card ID -> random.Random of sort keys.
+        super().__init__(None, template)
+
+    def populate_deck(self):
+        keyed = []
+        streams = self.streams
+        for card_id in self.template:
+            stream = streams.get(card_id)
+            if stream is None:
+                stream = streams[card_id] = random.Random(game_seed(self.seed, card_id))
+            keyed.append((stream.random(), card_id))
+        keyed.sort()
+        self.order = array('B', [card_id for _, card_id in keyed])
+        self.position = 0
+
+def play_shard(config, seed, start, stop, num_players, policy, max_rounds):
+    # Plays games [start, stop) of one configuration; returns (winning seat or
+    # -1 per game, rounds per game). Top-level so worker processes can pickle it.
+    template = config.template()
+    names = [f"Bot {i + 1}" for i in range(num_players)]
+    winners = array('b')
+    rounds = array('I')
+    for game_index in range(start, stop):
+        base = game_seed(seed, game_index)
+        deck = CommonDeck(game_seed(base, "deck"), template)
+        deciders = [make_decider(policy, random.Random(game_seed(base, f"seat{seat}")))
+                    for seat in range(num_players)]
+        game = Game(names, deciders, NullPresenter(), random.Random(game_seed(base, "table")),
+                    deck=deck, num_chambers=config.num_chambers, hand_size=config.hand_size)
+        winner = game.play(max_rounds)
+        winners.append(winner.seat if winner is not None else -1)
+        rounds.append(game.round_count)
+    return winners, rounds
+
+def run_sweep(configs, games, seed=0, num_players=4, policy="random", max_rounds=10000, workers=1):
+    # [(winners, rounds)] per configuration, game i of each from the same streams.
+    shards = [(start, min(start + SHARD_SIZE, games)) for start in range(0, games, SHARD_SIZE)]
+    jobs = [(config, seed, start, stop, num_players, policy, max_rounds)
+            for config in configs for start, stop in shards]
+    if workers == 1:
+        parts = [play_shard(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(play_shard, *zip(*jobs)))
+    results = []
+    for i in range(len(configs)):
+        winners, rounds = array('b'), array('I')
+        for shard_winners, shard_rounds in parts[i * len(shards):(i + 1) * len(shards)]:
+            winners.extend(shard_winners)
+            rounds.extend(shard_rounds)
+        results.append((winners, rounds))
+    return results
+
+# -------- Statistics --------
+
+def mean_ci(values):
+    # (mean, half-width of the 95% interval, sample variance).
+    n = len(values)
+    mean = sum(values) / n
+    var = sum((v - mean) ** 2 for v in values) / (n - 1) if n > 1 else 0.0
+    return mean, Z_95 * math.sqrt(var / n), var
+
+def summarize(results):
+    # Rows per configuration: for each metric (mean, ci, paired difference
+    # from the baseline, its ci, variance reduction from pairing).
+    columns = []
+    for winners, rounds in results:
+        columns.append([[float(fn(w, r)) for w, r in zip(winners, rounds)] for _, fn, _ in METRICS])
+    rows = []
+    for values in columns:
+        row = []
+        for m, metric in enumerate(values):
+            base = columns[0][m]
+            mean, ci, var = mean_ci(metric)
+            diff, diff_ci, diff_var = mean_ci([a - b for a, b in zip(metric, base)])
+            base_var = mean_ci(base)[2]
+            reduction = (var + base_var) / diff_var if diff_var else math.inf
+            row.append((mean, ci, diff, diff_ci, reduction))
+        rows.append(row)
+    return rows
+
+def format_value(value, percent):
+    return f"{value * 100:.1f}%" if percent else f"{value:.2f}"
+
+def print_table(configs, rows, varied_cards, games, out=sys.stdout):
+    labels = [config.label(varied_cards) for config in configs]
+    width = max(len(label) for label in labels)
+    header = f"{'configuration':{width}}"
+    for name, _, _ in METRICS:
+        header += f"  {name:>17}  {'vs base':>17} {'x':>5}"
+    print(f"{games} games per configuration; 95% intervals; first row is the baseline", file=out)
+    print(header, file=out)
+    for index, (label, row) in enumerate(zip(labels, rows)):
+        line = f"{label:{width}}"
+        for (_, _, percent), (mean, ci, diff, diff_ci, reduction) in zip(METRICS, row):
+            value = f"{format_value(mean, percent)} ±{format_value(ci, percent)}"
+            if index == 0:
+                line += f"  {value:>17}  {'':>17} {'':>5}"
+                continue
+            change = f"{'+' if diff >= 0 else ''}{format_value(diff, percent)} ±{format_value(diff_ci, percent)}"
+            line += f"  {value:>17}  {change:>17} {min(reduction, 999):5.1f}"
+        print(line.rstrip(), file=out)
+
+def write_csv(path, configs, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        header = ["num_chambers", "hand_size"] + [f"count:{name}" for name in default_counts()]
+        for name, _, _ in METRICS:
+            key = name.replace(" ", "_")
+            header += [key, f"{key}_ci", f"{key}_vs_base", f"{key}_vs_base_ci", f"{key}_variance_reduction"]
+        writer.writerow(header)
+        for config, row in zip(configs, rows):
+            line = [config.num_chambers, config.hand_size] + list(config.counts.values())
+            for cells in row:
+                line.extend(cells)
+            writer.writerow(line)
+
+# -------- Main --------
+
+def int_list(text):
+    return [int(value) for value in text.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description="Balance sweeps over deck, chamber and hand parameters.")
+    parser.add_argument("--games", type=int, default=1000, help="games per configuration")
+    parser.add_argument("--chambers", type=int_list, default=[6], metavar="N,N,...")
+    parser.add_argument("--hand-size", type=int_list, default=[4], metavar="N,N,...")
+    parser.add_argument("--card", action="append", default=[], metavar="NAME=N,N,...",
+                        help="copies of a card to try; repeat for more cards")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--policy", default="random", help="bot policy for every seat (see tournament.py)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-rounds", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    parser.add_argument("--csv", metavar="PATH", help="also write the results table here")
+    args = parser.parse_args()
+
+    card_counts = []
+    for spec in args.card:
+        name, _, counts = spec.rpartition("=")
+        try:
+            card_counts.append((CARDS.lookup(name), int_list(counts)))
+        except ValueError as e:
+            parser.error(f"--card {spec!r}: {e}")
+    if min(args.chambers) < 1 or min(args.hand_size) < 0:
+        parser.error("need at least one chamber and a non-negative hand size")
+    configs = build_grid(args.chambers, args.hand_size, card_counts)
+    varied = [name for name, _ in card_counts]
+
+    start = time.perf_counter()
+    results = run_sweep(configs, args.games, args.seed, args.players, args.policy, args.max_rounds,
+                        args.workers or os.cpu_count())
+    elapsed = time.perf_counter() - start
+    total = len(configs) * args.games
+    print(f"{len(configs)} configurations, {total} games in {elapsed:.1f}s "
+          f"({total / elapsed if elapsed else 0:.0f} games/sec)")
+    rows = summarize(results)
+    print_table(configs, rows, varied, args.games)
+    if args.csv:
+        write_csv(args.csv, configs, rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batchsim import BatchRevolverSim, cross_check
+
+@pytest.mark.parametrize("players, chambers", [(4, 6), (6, 20)])
+def test_batch_matches_the_object_engine(players, chambers):
+    passed, rows = cross_check(1500, players, chambers, seed=1)
+    assert passed, rows
+
+def test_same_seed_same_outcomes():
+    a = BatchRevolverSim(2000, seed=4).run()
+    b = BatchRevolverSim(2000, seed=4).run()
+    assert (a.winners == b.winners).all() and (a.rounds == b.rounds).all()
+
+def test_random_bits_picks_one_loaded_chamber_uniformly():
+    sim = BatchRevolverSim(1, num_chambers=6, seed=2)
+    sim.run()
+    bits = np.full(60000, 0b101001, dtype=sim.word)
+    picked = sim._random_bits(bits)
+    counts = {int(v): int(c) for v, c in zip(*np.unique(picked, return_counts=True))}
+    assert set(counts) == {0b1, 0b1000, 0b100000}
+    assert all(abs(c - 20000) < 1000 for c in counts.values())
+    assert not sim._random_bits(np.zeros(5, dtype=sim.word)).any()
+
+def test_bit_table_agrees_with_the_direct_lookup():
+    sim = BatchRevolverSim(1, num_chambers=8, seed=0)
+    sim.run()
+    masks = np.arange(256, dtype=sim.word)
+    for rank in range(8):
+        ranks = np.full(256, rank, dtype=sim.word)
+        assert (sim.bit_table[masks, ranks] == sim._bits_of_rank(masks, ranks)).all()
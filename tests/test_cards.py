@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from RussianROULETTED import CARDS, CardRegistry, Game, NullPresenter, RandomDecider
+
+class FirstTargetDecider(RandomDecider):
+    def choose_target(self, game, player, targets, prompt):
+        return 0
+
+class RecordingPresenter(NullPresenter):
+    def __init__(self):
+        self.said = []
+
+    def say(self, message):
+        self.said.append(message)
+
+def make_game(presenter=None):
+    rng = random.Random(0)
+    return Game(["a", "b", "c"], [FirstTargetDecider(rng) for _ in range(3)],
+                presenter or NullPresenter(), rng)
+
+def make_registry(calls):
+    registry = CardRegistry()
+
+    @registry.register("Tap", count=2)
+    def tap(game, player, target):
+        calls.append(("Tap", player.seat, target))
+        return "tapped"
+
+    @registry.register("Poke", count=1, target_prompt="Poke whom? ",
+                       block_message="  -> {name} blocked the poke!")
+    def poke(game, player, target):
+        calls.append(("Poke", player.seat, target.seat))
+        return "poked"
+
+    @registry.register("Wait", replicable=False)
+    def wait(game, player, target):
+        calls.append(("Wait", player.seat, target))
+        yield from game.suspense(0)
+        return "waited"
+
+    return registry
+
+def test_register_assigns_ids_and_builds_the_deck():
+    registry = make_registry([])
+    assert [t.name for t in registry.types] == ["Tap", "Poke", "Wait"]
+    assert registry.card_id("Poke") == 1
+    assert registry.card("Wait").card_id == 2
+    assert list(registry.deck_template) == [0, 0, 1, 2, 2, 2, 2]
+    assert registry.types[2].interactive and not registry.types[0].interactive
+    assert not registry.types[2].replicable
+
+def test_register_refuses_a_name_twice():
+    registry = make_registry([])
+    with pytest.raises(ValueError):
+        registry.register("Tap")(lambda game, player, target: None)
+
+def test_dispatch_calls_the_handler_for_the_card_id():
+    calls = []
+    registry = make_registry(calls)
+    game = make_game()
+    player = game.players[0]
+    assert game.run_steps(registry.dispatch(game, registry.card("Tap"), player)) == "tapped"
+    assert game.run_steps(registry.dispatch(game, registry.card("Wait"), player)) == "waited"
+    assert game.run_steps(registry.dispatch(game, registry.card("Poke"), player)) == "poked"
+    assert calls == [("Tap", 0, None), ("Wait", 0, None), ("Poke", 0, 1)]
+
+def test_a_blocked_target_stops_the_handler():
+    calls = []
+    registry = make_registry(calls)
+    presenter = RecordingPresenter()
+    game = make_game(presenter)
+    game.players[1].block_active = True
+    assert game.run_steps(registry.dispatch(game, registry.card("Poke"), game.players[0])) is None
+    assert calls == []
+    assert "  -> b blocked the poke!" in presenter.said
+    assert not game.players[1].block_active
+    # The block is used up, so the next poke lands.
+    assert game.run_steps(registry.dispatch(game, registry.card("Poke"), game.players[0])) == "poked"
+
+def test_lookup_forgives_case_and_apostrophes():
+    assert CARDS.lookup("peek' n see") == "Peek’ n see"
+    with pytest.raises(ValueError):
+        CARDS.lookup("No such card")
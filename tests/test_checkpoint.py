@@ -0,0 +1,98 @@
+import random
+import zlib
+
+import pytest
+
+import checkpoint
+from RussianROULETTED import Game, GameSnapshot, NullPresenter, RandomDecider
+
+def played_game(num_players=4, rounds=8, seed=3, **kwargs):
+    rng = random.Random(seed)
+    game = Game([f"P{seat}" for seat in range(num_players)],
+                [RandomDecider(rng) for _ in range(num_players)], NullPresenter(), rng, **kwargs)
+    game.play(max_rounds=rounds)
+    return game
+
+def state(game):
+    snapshot = GameSnapshot(game)
+    fields = {name: getattr(snapshot, name) for name in GameSnapshot.__slots__}
+    fields["cards_played"] = dict(fields["cards_played"])
+    return fields
+
+@pytest.mark.parametrize("seed", range(20))
+def test_round_trip(seed):
+    game = played_game(seed=seed)
+    data = checkpoint.dumps(game)
+    restored = checkpoint.loads(data)
+    assert state(restored) == state(game)
+    assert [p.name for p in restored.players] == [p.name for p in game.players]
+    assert checkpoint.dumps(restored) == data
+
+def test_round_trip_with_many_chambers():
+    game = played_game(num_chambers=100)
+    game.revolver.mask |= 1 << 99
+    game.revolver.loaded = game.revolver.mask.bit_count()
+    restored = checkpoint.loads(checkpoint.dumps(game))
+    assert restored.revolver.num_chambers == 100
+    assert restored.revolver.mask == game.revolver.mask
+    assert state(restored) == state(game)
+
+def test_too_many_chambers_are_refused():
+    game = played_game(rounds=0)
+    game.revolver.num_chambers = checkpoint.MAX_CHAMBERS + 1
+    with pytest.raises(ValueError):
+        checkpoint.dumps(game)
+
+def test_restored_game_plays_on_headless():
+    game = played_game(rounds=3)
+    rng = random.Random(1)
+    restored = checkpoint.loads(checkpoint.dumps(game), [RandomDecider(rng) for _ in game.players],
+                                rng=rng)
+    assert isinstance(restored.presenter, NullPresenter)
+    restored.play(max_rounds=500)
+    assert restored.round_count > game.round_count
+
+def test_corrupt_checkpoint_is_refused():
+    data = bytearray(checkpoint.dumps(played_game()))
+    data[20] ^= 1
+    with pytest.raises(ValueError):
+        checkpoint.loads(bytes(data))
+    with pytest.raises(ValueError):
+        checkpoint.loads(bytes(data[:10]))
+
+def test_store_saves_and_loads(tmp_path):
+    store = checkpoint.CheckpointStore(str(tmp_path))
+    game = played_game()
+    store.save("table-1", game)
+    assert list(store.table_ids()) == ["table-1"]
+    assert state(store.load("table-1")) == state(game)
+    store.remove("table-1")
+    assert list(store.table_ids()) == []
+
+def test_fields_too_big_for_the_format_are_refused():
+    game = played_game()
+    game.players[0].pending_bullet_modifier = 40000
+    with pytest.raises(ValueError):
+        checkpoint.dumps(game)
+    game = played_game()
+    game.players[1].hand *= 100
+    with pytest.raises(ValueError):
+        checkpoint.dumps(game)
+
+def test_malformed_body_is_refused():
+    # Damage the body but keep the CRC right: loads either restores some
+    # game or raises ValueError, never anything else.
+    data = checkpoint.dumps(played_game())
+    body = data[:-checkpoint.CRC.size]
+    rng = random.Random(0)
+    for _ in range(300):
+        damaged = bytearray(body)
+        if rng.random() < 0.5:
+            del damaged[rng.randrange(5, len(damaged)):]
+        else:
+            damaged[rng.randrange(5, len(damaged))] = rng.randrange(256)
+        damaged += checkpoint.CRC.pack(zlib.crc32(damaged))
+        try:
+            checkpoint.loads(bytes(damaged))
+        except ValueError:
+            pass
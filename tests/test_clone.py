@@ -0,0 +1,43 @@
+import random
+
+from RussianROULETTED import Game, GameSnapshot, NullPresenter, RandomDecider
+
+def new_game(rng, num_players=4):
+    return Game([f"P{seat}" for seat in range(num_players)],
+                [RandomDecider(rng) for _ in range(num_players)], NullPresenter(), rng)
+
+def state(game):
+    snapshot = GameSnapshot(game)
+    fields = {name: getattr(snapshot, name) for name in GameSnapshot.__slots__}
+    fields["cards_played"] = dict(fields["cards_played"])
+    return fields
+
+def copy_rng(rng):
+    copy = random.Random()
+    copy.setstate(rng.getstate())
+    return copy
+
+def test_clone_starts_in_the_same_state():
+    game = new_game(random.Random(1))
+    game.play(max_rounds=5)
+    assert state(game.clone()) == state(game)
+
+def test_clone_plays_out_like_the_original():
+    for seed in range(10):
+        rng = random.Random(seed)
+        game = new_game(rng)
+        game.play(max_rounds=4)
+        clone_rng = copy_rng(rng)
+        clone = game.clone(rng=clone_rng, deciders=[RandomDecider(clone_rng) for _ in game.players])
+        winner = game.play(max_rounds=10000)
+        clone_winner = clone.play(max_rounds=10000)
+        assert (winner and winner.seat) == (clone_winner and clone_winner.seat)
+        assert state(clone) == state(game)
+
+def test_playing_a_clone_leaves_the_original_alone():
+    game = new_game(random.Random(2))
+    game.play(max_rounds=3)
+    before = state(game)
+    clone = game.clone(rng=random.Random(9), deciders=[RandomDecider(random.Random(9)) for _ in game.players])
+    clone.play(max_rounds=10000)
+    assert state(game) == before
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from RussianROULETTED import Game, NullPresenter, RandomDecider
+from eventlog import (
+    GAME_START, HEADER, MAX_SEATS, RECORD, TURN_START, EventLogReader, EventLogWriter,
+    ReplayState, next_game_id,
+)
+
+def log_games(path, n, seed=0, **kwargs):
+    # Plays n games into the log, letting the writer number them.
+    rng = random.Random(seed)
+    with EventLogWriter(path, **kwargs) as log:
+        for _ in range(n):
+            Game([f"P{seat}" for seat in range(4)], [RandomDecider(rng) for _ in range(4)],
+                 NullPresenter(), rng, event_log=log).play(max_rounds=10000)
+
+def test_replay_matches_the_game(tmp_path):
+    path = str(tmp_path / "games.rrlog")
+    rng = random.Random(4)
+    with EventLogWriter(path) as log:
+        game = Game([f"P{seat}" for seat in range(4)], [RandomDecider(rng) for _ in range(4)],
+                    NullPresenter(), rng, event_log=log)
+        winner = game.play(max_rounds=10000)
+    with EventLogReader(path) as reader:
+        state = reader.replay(game.game_id)
+    assert state.finished
+    assert state.winner == (None if winner is None else winner.seat)
+    assert state.eliminated == game.eliminated
+    assert state.mask == game.revolver.mask
+    assert state.current_chamber == game.revolver.current_chamber
+    for seat, p in enumerate(game.players):
+        assert sorted(state.hands[seat]) == sorted(card.card_id for card in p.hand)
+
+def test_replay_until_a_round(tmp_path):
+    path = str(tmp_path / "games.rrlog")
+    log_games(path, 1)
+    with EventLogReader(path) as reader:
+        state = reader.replay(0, until_round=2)
+        turns = [r for r in reader if r[2] == TURN_START and r[1] <= 2]
+    assert not state.finished
+    assert state.round <= 2
+    assert state.current_seat == turns[-1][3]
+
+def test_appended_runs_get_new_game_ids(tmp_path):
+    path = str(tmp_path / "games.rrlog")
+    log_games(path, 5)
+    assert next_game_id(path) == 5
+    log_games(path, 3, seed=1)
+    with EventLogReader(path) as reader:
+        assert reader.game_ids() == list(range(8))
+        assert reader.replay(6).finished
+
+def test_duplicate_game_ids_are_reported(tmp_path):
+    path = str(tmp_path / "games.rrlog")
+    log_games(path, 2)
+    log_games(path, 2, seed=1, first_game_id=1)
+    with EventLogReader(path) as reader:
+        assert reader.game_ids() == [0, 1, 1, 2]
+        with pytest.raises(ValueError):
+            reader.replay(1)
+        assert reader.replay(2).finished
+
+def test_game_start_resets_replay_state(tmp_path):
+    path = str(tmp_path / "games.rrlog")
+    log_games(path, 2)
+    with EventLogReader(path) as reader:
+        first, second = ([r for r in reader if r[0] == gid] for gid in (0, 1))
+        fresh = reader.replay(1)
+    state = ReplayState(1)
+    for record in first + second:
+        state.apply(*record[1:6])
+    assert vars(state) == vars(fresh)
+
+def test_torn_record_is_ignored(tmp_path):
+    path = str(tmp_path / "games.rrlog")
+    log_games(path, 1)
+    with open(path, "ab") as f:
+        f.write(RECORD.pack(0, 0, GAME_START, 4, 6, 0, 0)[:7])
+    with EventLogReader(path) as reader:
+        assert len(reader) * RECORD.size + len(HEADER) + 7 == (tmp_path / "games.rrlog").stat().st_size
+        assert reader.game_ids() == [0]
+
+def test_too_many_seats_are_refused(tmp_path):
+    with EventLogWriter(str(tmp_path / "games.rrlog")) as log:
+        with pytest.raises(ValueError):
+            Game([str(seat) for seat in range(MAX_SEATS + 1)], [None] * (MAX_SEATS + 1),
+                 NullPresenter(), random.Random(0), event_log=log)
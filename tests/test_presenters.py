@@ -0,0 +1,83 @@
+import random
+
+from RussianROULETTED import CARDS, Game, RandomDecider
+from server import TablePresenter
+
+class RecordingPresenter:
+    # Keeps public and private lines apart; no pauses.
+    quiet = False
+    suspense = False
+
+    def __init__(self):
+        self.said = []
+        self.told = []
+
+    def say(self, message):
+        self.said.append(message)
+
+    def tell(self, player, message):
+        self.told.append((player.seat, message))
+
+    def pause(self, seconds):
+        pass
+
+class FakeConnection:
+    def __init__(self):
+        self.lines = []
+
+    def send(self, line):
+        self.lines.append(line)
+
+class Seat:
+    def __init__(self, seat):
+        self.seat = seat
+
+class WhatchaDecider(RandomDecider):
+    def choose_action(self, game, player):
+        return "p"
+
+    def choose_card(self, game, player):
+        return 0
+
+    def choose_target(self, game, player, targets, prompt):
+        return 0
+
+def test_hands_are_only_told_to_their_owner():
+    rng = random.Random(2)
+    presenter = RecordingPresenter()
+    game = Game(["a", "b", "c"], [RandomDecider(rng) for _ in range(3)], presenter, rng)
+    game.play(max_rounds=30)
+    card_names = {card_type.name for card_type in CARDS.types}
+    assert not [line for line in presenter.said if line.strip().partition(": ")[2] in card_names]
+    assert {seat for seat, message in presenter.told if message == "Your current hand:"} == {0, 1, 2}
+
+def test_revealed_hand_is_only_told_to_the_player_who_asked():
+    rng = random.Random(0)
+    presenter = RecordingPresenter()
+    game = Game(["a", "b"], [WhatchaDecider(rng), RandomDecider(rng)], presenter, rng)
+    game.players[0].hand[0] = CARDS.card("Whatcha u’ got of there")
+    revealed = [card.name for card in game.players[1].hand]
+    game.play(max_rounds=1)
+    told = [message for seat, message in presenter.told if seat == 0]
+    assert [f"     - {name}" for name in revealed] == [m for m in told if m.startswith("     - ")]
+    assert not any(name in line for line in presenter.said for name in revealed
+                   if line.startswith("     - "))
+
+def test_table_presenter_tells_one_connection():
+    connections = [FakeConnection(), FakeConnection()]
+    presenter = TablePresenter(connections, pace=0, quiet=False)
+    presenter.say("Round 1")
+    presenter.tell(Seat(1), "Your current hand:\n  0: Nope")
+    assert connections[0].lines == ["SAY Round 1"]
+    assert connections[1].lines == ["SAY Round 1", "SAY Your current hand:", "SAY   0: Nope"]
+
+def test_targets_are_listed_in_turn_order_after_an_elimination():
+    rng = random.Random(0)
+    presenter = RecordingPresenter()
+    game = Game([f"P{seat}" for seat in range(5)], [WhatchaDecider(rng) for _ in range(5)],
+                presenter, rng)
+    game.turn_order.remove(game.players[1])
+    target = game.choose_target(game.players[0])
+    listing = presenter.said[presenter.said.index("Available targets:") + 1:]
+    assert listing == ["  0: P2", "  1: P3", "  2: P4"]
+    assert target is game.players[2]
@@ -0,0 +1,29 @@
+from array import array
+
+from RussianROULETTED import BulkRandom
+
+def draws(rng):
+    return ([rng.randrange(6) for _ in range(300)], [rng.randint(1, 3) for _ in range(50)],
+            [rng.choice("abc") for _ in range(50)], rng.sample(range(20), 5))
+
+def test_same_seed_same_draws():
+    assert draws(BulkRandom(7)) == draws(BulkRandom(7))
+    assert draws(BulkRandom(7)) != draws(BulkRandom(8))
+
+def test_draws_stay_in_range():
+    rng = BulkRandom(1, block=16)
+    assert set(rng.randrange(6) for _ in range(2000)) == set(range(6))
+    assert set(rng.randint(2, 4) for _ in range(2000)) == {2, 3, 4}
+
+def test_shuffle_permutes_an_array_in_place():
+    deck = array('B', range(60))
+    BulkRandom(3, block=16).shuffle(deck)
+    assert deck.typecode == 'B'
+    assert sorted(deck) == list(range(60))
+    assert list(deck) != list(range(60))
+
+def test_shuffle_is_reproducible():
+    a, b = list(range(40)), list(range(40))
+    BulkRandom(5).shuffle(a)
+    BulkRandom(5).shuffle(b)
+    assert a == b
@@ -0,0 +1,44 @@
+import random
+
+from RussianROULETTED import Revolver
+
+def test_starts_with_one_bullet():
+    revolver = Revolver(64, random.Random(0))
+    assert revolver.loaded_count() == 1
+    assert bin(revolver.mask).count("1") == 1
+    assert 0 <= revolver.current_chamber < 64
+
+def test_fills_and_empties_a_64_chamber_revolver():
+    revolver = Revolver(64, random.Random(1))
+    for count in range(2, 65):
+        assert revolver.add_bullet()
+        assert revolver.loaded_count() == count == bin(revolver.mask).count("1")
+    assert revolver.mask == (1 << 64) - 1
+    assert not revolver.add_bullet()
+    for count in range(63, -1, -1):
+        assert revolver.remove_bullet()
+        assert revolver.loaded_count() == count == bin(revolver.mask).count("1")
+    assert revolver.mask == 0
+    assert not revolver.remove_bullet()
+    assert revolver.chambers == [False] * 64
+
+def test_picks_reach_every_candidate_chamber():
+    # Few candidates take the bit-stripping path, many take rejection sampling.
+    rng = random.Random(2)
+    sparse, dense = set(), set()
+    revolver = Revolver(64, rng)
+    for _ in range(300):
+        revolver.mask, revolver.loaded = (1 << 5) | (1 << 40) | (1 << 63), 3
+        revolver.remove_bullet()
+        sparse.add((((1 << 5) | (1 << 40) | (1 << 63)) ^ revolver.mask).bit_length() - 1)
+        revolver.mask, revolver.loaded = (1 << 64) - 1, 64
+        revolver.remove_bullet()
+        dense.add((((1 << 64) - 1) ^ revolver.mask).bit_length() - 1)
+    assert sparse == {5, 40, 63}
+    assert dense == set(range(64))
+
+def test_pulls_walk_the_cylinder():
+    revolver = Revolver(64, random.Random(3))
+    revolver.mask, revolver.loaded, revolver.current_chamber = 1 << 63, 1, 62
+    assert [revolver.pull_trigger() for _ in range(3)] == [False, True, False]
+    assert revolver.current_chamber == 1
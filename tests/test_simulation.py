@@ -0,0 +1,19 @@
+import random
+
+import pytest
+
+from RussianROULETTED import BulkRandom, run_simulation
+
+def stats(result):
+    return {key: value for key, value in result.items() if key not in ("seconds", "games_per_sec")}
+
+@pytest.mark.parametrize("rng_class", [BulkRandom, random.Random])
+def test_results_do_not_depend_on_the_worker_count(rng_class):
+    one = run_simulation(600, seed=11, workers=1, shard_size=100, rng_class=rng_class)
+    three = run_simulation(600, seed=11, workers=3, shard_size=100, rng_class=rng_class)
+    assert stats(one) == stats(three)
+    assert sum(one["wins_by_seat"]) + one["no_winner"] == 600
+
+def test_a_seed_reproduces_its_results():
+    assert stats(run_simulation(200, seed=4, workers=1)) == stats(run_simulation(200, seed=4, workers=1))
+    assert stats(run_simulation(200, seed=4, workers=1)) != stats(run_simulation(200, seed=5, workers=1))
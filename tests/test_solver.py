@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from RussianROULETTED import CARDS, Game, NullPresenter, RandomDecider
+from solver import Solver, solve_game, state_from_game
+
+def endgame(hands=((), ()), num_chambers=6, bullets=(), chamber=0):
+    rng = random.Random(0)
+    names = "abcdefgh"[:len(hands)]
+    game = Game(list(names), [RandomDecider(rng) for _ in names], NullPresenter(), rng,
+                num_chambers=num_chambers)
+    for p, hand in zip(game.players, hands):
+        p.hand = [CARDS.card(name) for name in hand]
+    game.revolver.mask = sum(1 << c for c in bullets)
+    game.revolver.loaded = len(bullets)
+    game.revolver.current_chamber = chamber
+    return game
+
+@pytest.mark.parametrize("offset", range(6))
+def test_odds_follow_the_true_revolver(offset):
+    # With empty hands the players just take turns pulling: whoever reaches
+    # the bullet first loses.
+    odds = solve_game(endgame(bullets=[(2 + offset) % 6], chamber=2))
+    assert odds == ({"a": 0.0, "b": 1.0} if offset % 2 == 0 else {"a": 1.0, "b": 0.0})
+
+def test_public_odds_average_the_arrangements():
+    game = endgame(bullets=[0])
+    key = state_from_game(game)
+    solver = Solver(2)
+    values = solver.values(key.state)
+    average = [sum(p * values[2 * i + seat] for i, (_, p) in enumerate(key.state.belief))
+               for seat in range(2)]
+    assert average == pytest.approx([0.5, 0.5])
+
+def test_empty_gun_stalls_without_a_winner():
+    assert solve_game(endgame()) == {"a": 0.0, "b": 0.0}
+
+def test_nope_hands_the_bullet_on():
+    # "a" can't see the bullet is next, and on average skipping doesn't
+    # help, so "a" pulls and loses.
+    assert solve_game(endgame(hands=(["Nope"], []), bullets=[0])) == {"a": 0.0, "b": 1.0}
+
+def test_wide_empty_revolver_is_refused():
+    game = endgame(hands=(["Bullets!!!"], []), num_chambers=40)
+    with pytest.raises(ValueError):
+        solve_game(game)
@@ -0,0 +1,62 @@
+import itertools
+import random
+
+from tournament import Standing, Tournament, update_ratings
+
+def swiss(n, seats, rounds, seed=1):
+    # Runs the pairing alone, with ratings drifting at random between rounds.
+    tournament = Tournament({f"e{i}": "random" for i in range(n)}, seats, "swiss", rounds)
+    rng = random.Random(seed)
+    tables = []
+    for _ in range(rounds):
+        tournament.start_round()
+        tables.append(tournament.round_tables)
+        for standing in tournament.standings.values():
+            standing.rating += rng.gauss(0, 30)
+    return tournament, tables
+
+def test_byes_rotate_through_the_field():
+    tournament, _ = swiss(5, 4, 30)
+    assert [s.byes for s in tournament.standings.values()] == [6] * 5
+
+def test_bye_goes_to_the_lowest_rated_with_fewest_byes():
+    tournament = Tournament({name: "random" for name in "abcde"}, 4, "swiss", 1)
+    for rating, name in enumerate("abcde"):
+        tournament.standings[name].rating = 1500 + 10 * rating
+    tournament.standings["a"].byes = 1
+    tournament.start_round()
+    seated = {name for table in tournament.round_tables for name in table}
+    assert seated == set("acde")
+    assert tournament.standings["b"].byes == 1
+
+def test_no_rematches_until_everyone_has_met():
+    tournament, _ = swiss(8, 2, 7)
+    assert set(tournament.met.values()) == {1}
+    tournament, _ = swiss(8, 2, 10)
+    assert max(tournament.met.values()) == 2
+
+def test_tables_are_whole_and_disjoint():
+    _, rounds = swiss(11, 3, 5)
+    for tables in rounds:
+        names = [name for table in tables for name in table]
+        assert len(names) == len(set(names)) == 9
+        assert all(len(table) == 3 for table in tables)
+
+def test_checkpoint_keeps_byes_and_meetings(tmp_path):
+    tournament, _ = swiss(5, 2, 3)
+    path = str(tmp_path / "cup.json")
+    tournament.save(path)
+    loaded = Tournament.load(path)
+    assert loaded.met == tournament.met
+    assert [s.byes for s in loaded.standings.values()] == [s.byes for s in tournament.standings.values()]
+    assert loaded.pair_round() == tournament.pair_round()
+
+def test_round_robin_seats_every_combination():
+    tournament = Tournament({name: "random" for name in "abcd"}, 3, "round-robin", 1)
+    assert tournament.pair_round() == [list(t) for t in itertools.combinations("abcd", 3)]
+
+def test_ratings_move_towards_the_winner():
+    standings = {name: Standing() for name in "abc"}
+    update_ratings(standings, ["a", "b", "c"], [0, 1, 2], 16.0)
+    assert standings["a"].rating > 1500 > standings["c"].rating
+    assert standings["a"].wins == 1
@@ -0,0 +1,179 @@
+import random
+
+import pytest
+
+from RussianROULETTED import CARDS, Game, NullPresenter, TurnOrder
+
+class Seat:
+    def __init__(self, seat):
+        self.seat = seat
+
+class ScriptedDecider:
+    # Passes on cards unless given one to play; always picks target 0.
+    def __init__(self, card=None, focused_mode="k"):
+        self.card = card
+        self.focused_mode = focused_mode
+
+    def choose_action(self, game, player):
+        return "p" if self.card is not None else "n"
+
+    def choose_discards(self, game, player):
+        return []
+
+    def choose_play_after_discard(self, game, player):
+        return "n"
+
+    def choose_extra_play(self, game, player):
+        return "n"
+
+    def choose_card(self, game, player):
+        return [card.name for card in player.hand].index(self.card)
+
+    def choose_target(self, game, player, targets, prompt):
+        return 0
+
+    def choose_focused_mode(self, game, player):
+        return self.focused_mode
+
+    def choose_chamber(self, game, player):
+        return None
+
+def seats(n):
+    return [Seat(seat) for seat in range(n)]
+
+def seat_numbers(players):
+    return [p.seat for p in players]
+
+# -------- TurnOrder --------
+
+def test_next_and_previous_follow_the_direction():
+    players = seats(4)
+    order = TurnOrder(players)
+    assert order.next_of(players[3]) is players[0]
+    assert order.previous_of(players[0]) is players[3]
+    order.reverse()
+    assert order.next_of(players[0]) is players[3]
+    assert order.previous_of(players[3]) is players[0]
+
+def test_advance_wraps_and_reverses():
+    order = TurnOrder(seats(3))
+    visited = []
+    for _ in range(4):
+        order.advance()
+        visited.append(order.current)
+    assert visited == [1, 2, 0, 1]
+    order.reverse()
+    order.advance()
+    assert order.current == 0
+    assert seat_numbers(order.in_order()) == [0, 2, 1]
+
+def test_remove_unlinks_the_seat():
+    players = seats(5)
+    order = TurnOrder(players)
+    order.remove(players[2])
+    assert len(order) == 4
+    assert not order.is_active(players[2])
+    assert order.next_of(players[1]) is players[3]
+    assert order.previous_of(players[3]) is players[1]
+    assert seat_numbers(order.in_order()) == [0, 1, 3, 4]
+
+@pytest.mark.parametrize("reversed_, expected", [(False, 3), (True, 1)])
+def test_removing_the_current_seat_passes_the_turn_on(reversed_, expected):
+    players = seats(4)
+    order = TurnOrder(players)
+    order.current = 2
+    if reversed_:
+        order.reverse()
+    order.remove(players[2])
+    order.advance()
+    assert order.current == expected
+
+def test_targets_index_everyone_but_the_chooser():
+    players = seats(5)
+    order = TurnOrder(players)
+    targets = order.targets(players[1])
+    assert len(targets) == 4
+    assert seat_numbers(targets) == [0, 2, 3, 4]
+    with pytest.raises(IndexError):
+        targets[4]
+    order.remove(players[0])
+    targets = order.targets(players[3])
+    assert sorted(seat_numbers(targets)) == [1, 2, 4]
+    assert players[3] not in list(targets)
+
+def test_in_order_after_removing_the_current_seat():
+    # The turn goes back to the seat before, so in_order starts there.
+    players = seats(4)
+    order = TurnOrder(players)
+    order.current = 1
+    order.remove(players[1])
+    assert seat_numbers(order.in_order()) == [0, 2, 3]
+    order.remove(players[0])
+    assert seat_numbers(order.in_order()) == [3, 2]
+    order.remove(players[2])
+    order.remove(players[3])
+    assert order.in_order() == []
+
+# -------- Turn passing --------
+
+def make_game(n, deciders, loaded_chambers=(), chamber=0, seed=0):
+    game = Game([f"P{seat}" for seat in range(n)], deciders, NullPresenter(), random.Random(seed))
+    revolver = game.revolver
+    revolver.mask = sum(1 << c for c in loaded_chambers)
+    revolver.loaded = len(loaded_chambers)
+    revolver.current_chamber = chamber
+    return game
+
+def give(player, name):
+    player.hand[0] = CARDS.card(name)
+
+def test_trigger_elimination_passes_the_turn_to_the_next_seat():
+    game = make_game(4, [ScriptedDecider() for _ in range(4)], loaded_chambers=[0])
+    game.play(max_rounds=1)
+    assert game.eliminated == [0]
+    assert game.turn_order.current_player is game.players[1]
+
+def test_trigger_elimination_after_reverse_passes_the_turn_backwards():
+    deciders = [ScriptedDecider("Reverse")] + [ScriptedDecider() for _ in range(3)]
+    game = make_game(4, deciders, loaded_chambers=[0])
+    give(game.players[0], "Reverse")
+    game.play(max_rounds=1)
+    assert game.eliminated == [0]
+    assert game.turn_order.current_player is game.players[3]
+
+def test_eliminated_player_gets_no_refill():
+    deciders = [ScriptedDecider("Peek’ n see")] + [ScriptedDecider() for _ in range(2)]
+    game = make_game(3, deciders, loaded_chambers=[0])
+    give(game.players[0], "Peek’ n see")
+    game.play(max_rounds=1)
+    assert game.eliminated == [0]
+    assert len(game.players[0].hand) == game.hand_size - 1
+
+def test_surviving_player_is_refilled():
+    deciders = [ScriptedDecider("Peek’ n see")] + [ScriptedDecider() for _ in range(2)]
+    game = make_game(3, deciders)
+    give(game.players[0], "Peek’ n see")
+    game.play(max_rounds=1)
+    assert game.eliminated == []
+    assert len(game.players[0].hand) == game.hand_size
+    assert game.turn_order.current_player is game.players[1]
+
+def test_card_elimination_does_not_shift_the_turn():
+    # Seat 0 kills seat 1 with Focused action, then still pulls the trigger
+    # itself; the turn then skips the empty seat.
+    deciders = [ScriptedDecider("Focused action")] + [ScriptedDecider() for _ in range(3)]
+    game = make_game(4, deciders)
+    give(game.players[0], "Focused action")
+    game.play(max_rounds=1)
+    assert game.eliminated == [1]
+    assert game.revolver.current_chamber == 1    # Seat 0 pulled once.
+    assert game.turn_order.current_player is game.players[2]
+
+def test_forced_elimination_of_the_next_seat_skips_it():
+    deciders = [ScriptedDecider("Give Jimmy a chance")] + [ScriptedDecider() for _ in range(3)]
+    game = make_game(4, deciders, loaded_chambers=[0])
+    give(game.players[0], "Give Jimmy a chance")
+    game.play(max_rounds=1)
+    assert game.eliminated == [1]
+    assert len(game.players[0].hand) == game.hand_size
+    assert game.turn_order.current_player is game.players[2]
@@ -0,0 +1,374 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from RussianROULETTED import Game, NullPresenter, RandomDecider, game_seed
+
+# Tournaments between bot policies:
+#
+#   python tournament.py --entrant rnd=random --entrant mcts=mcts:200 \
+#       --entrant pass=passive --seats 3 --format swiss --rounds 20 \
+#       --workers 8 --checkpoint cup.json
+#
+# A tournament is a sequence of rounds. Each round is a list of tables
+# (which entrants sit together), and every table is played once per seat
+# rotation so nobody keeps the first-player advantage. Round-robin rounds
+# seat every combination of entrants; Swiss rounds sort entrants by rating
+# and seat neighbours together, avoiding tables of entrants who have met
+# before where they can. When the entrants don't fill whole tables, the
+# byes go to the lowest rated of those with the fewest byes so far.
+#
+# Games are played in batches, in parallel, but results are applied in
+# schedule order, so ratings don't depend on the number of workers. Every
+# game is seeded from (seed, game number), and a checkpoint records the
+# position in the schedule, so a resumed tournament ends exactly where an
+# uninterrupted one would have.
+
+SWISS_SEARCH = 10000    # Seatings tried per Swiss round before taking the best so far.
+
+# -------- Policies --------
+
+class PassiveDecider(RandomDecider):
+    # Never plays or discards a card; just pulls the trigger.
+    def choose_action(self, game, player):
+        return 'n'
+
+class AggressiveDecider(RandomDecider):
+    # Plays a random card whenever it can.
+    def choose_action(self, game, player):
+        return 'p' if player.hand else 'n'
+
+    def choose_extra_play(self, game, player):
+        return 'p'
+
+def make_decider(spec, rng):
+    # Policy spec -> decider: "random", "passive", "aggressive",
+    # "mcts:N" (N rollouts per turn, deterministic) or "mcts:Ts" (T seconds).
+    name, _, arg = spec.partition(":")
+    if name == "random":
+        return RandomDecider(rng)
+    if name == "passive":
+        return PassiveDecider(rng)
+    if name == "aggressive":
+        return AggressiveDecider(rng)
+    if name == "mcts":
+        from mcts import MCTSDecider
+        if arg.endswith("s"):
+            return MCTSDecider(budget=float(arg[:-1]), rng=rng)
+        return MCTSDecider(budget=math.inf, rng=rng, max_iterations=int(arg or 200))
+    raise ValueError(f"Unknown policy {spec!r}")
+
+# -------- Games --------
+
+def finishing_places(game):
+    # Place per seat, 0 = best. Survivors share the best place, and players
+    # knocked out later beat those knocked out earlier.
+    n = len(game.players)
+    places = [0] * n
+    for order, seat in enumerate(game.eliminated):
+        places[seat] = n - 1 - order
+    return places
+
+def play_batch(seed, games, max_rounds):
+    # Plays [(game number, policy spec per seat)] and returns their places.
+    # Top-level so worker processes can pickle it.
+    results = []
+    for game_index, specs in games:
+        rng = random.Random(game_seed(seed, game_index))
+        names = [f"Seat {i + 1}" for i in range(len(specs))]
+        game = Game(names, [make_decider(spec, rng) for spec in specs], NullPresenter(), rng)
+        game.play(max_rounds)
+        results.append(finishing_places(game))
+    return results
+
+# -------- Ratings --------
+
+class Standing:
+    __slots__ = ("rating", "games", "wins", "place_total", "byes")
+
+    def __init__(self, rating=1500.0, games=0, wins=0, place_total=0, byes=0):
+        self.rating = rating
+        self.games = games
+        self.wins = wins
+        self.place_total = place_total
+        self.byes = byes    # Swiss rounds sat out.
+
+def update_ratings(standings, table, places, k_factor):
+    # Multiplayer Elo: each game counts as a result between every pair at
+    # the table, scaled so one game moves a rating by at most k_factor.
+    # O(seats^2) per game; nothing is recomputed from history.
+    ratings = [standings[name].rating for name in table]
+    n = len(table)
+    for i, name in enumerate(table):
+        delta = 0.0
+        for j in range(n):
+            if i == j:
+                continue
+            expected = 1.0 / (1.0 + 10.0 ** ((ratings[j] - ratings[i]) / 400.0))
+            actual = 1.0 if places[i] < places[j] else 0.5 if places[i] == places[j] else 0.0
+            delta += actual - expected
+        standing = standings[name]
+        standing.rating += k_factor * delta / (n - 1)
+        standing.games += 1
+        standing.wins += places[i] == 0 and places.count(0) == 1
+        standing.place_total += places[i]
+
+# -------- Tournament --------
+
+class Tournament:
+    def __init__(self, entrants, seats=4, format="round-robin", rounds=1, seed=0, k_factor=16.0,
+                 max_rounds=1000):
+        # entrants maps entrant names to policy specs (see make_decider).
+        if format not in ("round-robin", "swiss"):
+            raise ValueError(f"Unknown format {format!r}")
+        if len(entrants) < seats:
+            raise ValueError(f"Need at least {seats} entrants for {seats}-seat tables")
+        self.entrants = dict(entrants)
+        self.seats = seats
+        self.format = format
+        self.rounds = rounds
+        self.seed = seed
+        self.k_factor = k_factor
+        self.max_rounds = max_rounds
+        self.standings = {name: Standing() for name in self.entrants}
+        self.met = {}       # (name, name) in sorted order -> rounds they shared a table.
+        # Position in the schedule.
+        self.round = 0
+        self.round_tables = None    # Tables of the current round, fixed when it starts.
+        self.next_game = 0          # Index into the current round's games.
+        self.games_played = 0       # Also the number of the next game, for seeding.
+
+    def config(self):
+        return {"entrants": self.entrants, "seats": self.seats, "format": self.format,
+                "rounds": self.rounds, "seed": self.seed, "k_factor": self.k_factor,
+                "max_rounds": self.max_rounds}
+
+    def pair_round(self):
+        # Tables of the next round. Doesn't record anything; see start_round.
+        names = list(self.entrants)
+        if self.format == "round-robin":
+            return [list(table) for table in itertools.combinations(names, self.seats)]
+        # Swiss: the byes go to the entrants with the fewest byes so far,
+        # lowest rated first, and the rest are seated by rating.
+        standings = self.standings
+        byes = set(sorted(names, key=lambda name: (standings[name].byes, standings[name].rating,
+                                                   name))[:len(names) % self.seats])
+        ranked = sorted((name for name in names if name not in byes),
+                        key=lambda name: (-standings[name].rating, name))
+        return self.swiss_tables(ranked)
+
+    def swiss_tables(self, ranked):
+        # Splits `ranked` (best first) into tables, seating as few pairs that
+        # have met before as it can find. Depth-first over seatings with the
+        # best-ranked, least-met candidates first, so the first seating found
+        # is the greedy one; stops at one without rematches or after
+        # SWISS_SEARCH steps, keeping the best seen.
+        met = self.met
+        seats = self.seats
+        best = [None, math.inf]
+        steps = 0
+
+        def search(remaining, tables, table, after, cost):
+            # table is being filled from remaining[after:].
+            nonlocal steps
+            steps += 1
+            if cost >= best[1] or steps > SWISS_SEARCH:
+                return
+            if len(table) == seats:
+                tables = tables + [table]
+                if not remaining:
+                    best[0], best[1] = tables, cost
+                    return
+                search(remaining[1:], tables, [remaining[0]], 0, cost)
+                return
+            candidates = []
+            for i in range(after, len(remaining)):
+                name = remaining[i]
+                repeats = sum(met.get((min(name, seated), max(name, seated)), 0) for seated in table)
+                candidates.append((repeats, i))
+            candidates.sort()
+            for repeats, i in candidates:
+                if len(remaining) - i - 1 < seats - len(table) - 1:
+                    continue    # Too few names left after it to fill the table.
+                search(remaining[:i] + remaining[i + 1:], tables, table + [remaining[i]], i,
+                       cost + repeats)
+                if best[1] == 0:
+                    return
+
+        search(ranked[1:], [], [ranked[0]], 0, 0)
+        return best[0]
+
+    def start_round(self):
+        # Fixes the tables of the next round and records who met and who sat out.
+        self.round_tables = self.pair_round()
+        self.next_game = 0
+        seated = set()
+        for table in self.round_tables:
+            seated.update(table)
+            for pair in itertools.combinations(sorted(table), 2):
+                self.met[pair] = self.met.get(pair, 0) + 1
+        for name in self.entrants:
+            if name not in seated:
+                self.standings[name].byes += 1
+
+    def round_games(self):
+        # Every table once per seat rotation: [(entrant names in seat order)].
+        games = []
+        for table in self.round_tables:
+            for shift in range(len(table)):
+                games.append(table[shift:] + table[:shift])
+        return games
+
+    def finished(self):
+        return self.round >= self.rounds
+
+    def run(self, workers=1, batch_size=100, checkpoint_path=None, checkpoint_every=30.0,
+            max_games=None, say=print):
+        # Plays until the tournament ends (or max_games more games), keeping
+        # at most two batches per worker in flight.
+        pool = ProcessPoolExecutor(workers) if workers > 1 else None
+        last_checkpoint = last_report = time.monotonic()
+        budget = max_games
+        try:
+            while not self.finished() and (budget is None or budget > 0):
+                if self.round_tables is None:
+                    self.start_round()
+                games = self.round_games()
+                first = self.next_game
+                stop = len(games) if budget is None else min(len(games), self.next_game + budget)
+                batches = []
+                for start in range(self.next_game, stop, batch_size):
+                    end = min(start + batch_size, stop)
+                    numbered = [(self.games_played + i - self.next_game, self.specs(games[i]))
+                                for i in range(start, end)]
+                    batches.append((start, end, numbered))
+                pending = []
+                for batch in batches:
+                    pending.append((batch, self.submit(pool, batch[2])))
+                    if len(pending) >= 2 * max(workers, 1):
+                        self.apply(pending.pop(0), games)
+                        if checkpoint_path and time.monotonic() - last_checkpoint >= checkpoint_every:
+                            self.save(checkpoint_path)
+                            last_checkpoint = time.monotonic()
+                while pending:
+                    self.apply(pending.pop(0), games)
+                if budget is not None:
+                    budget -= stop - first
+                if self.next_game >= len(games):
+                    self.round += 1
+                    self.round_tables = None
+                    if time.monotonic() - last_report >= 10 or self.finished():
+                        say(f"Round {self.round}/{self.rounds} done, {self.games_played} games played")
+                        last_report = time.monotonic()
+                if checkpoint_path and time.monotonic() - last_checkpoint >= checkpoint_every:
+                    self.save(checkpoint_path)
+                    last_checkpoint = time.monotonic()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        if checkpoint_path:
+            self.save(checkpoint_path)
+        return self.leaderboard()
+
+    def specs(self, table):
+        return [self.entrants[name] for name in table]
+
+    def submit(self, pool, numbered):
+        if pool is None:
+            return play_batch(self.seed, numbered, self.max_rounds)
+        return pool.submit(play_batch, self.seed, numbered, self.max_rounds)
+
+    def apply(self, item, games):
+        # Folds one finished batch into the ratings, in schedule order.
+        (start, end, _), result = item
+        places_list = result if isinstance(result, list) else result.result()
+        for i, places in zip(range(start, end), places_list):
+            update_ratings(self.standings, games[i], places, self.k_factor)
+        self.games_played += end - start
+        self.next_game = end
+
+    def leaderboard(self):
+        # [(name, rating, games, wins, mean place)] best first.
+        rows = []
+        for name, s in self.standings.items():
+            rows.append((name, s.rating, s.games, s.wins, s.place_total / s.games if s.games else 0.0))
+        return sorted(rows, key=lambda row: -row[1])
+
+    # -------- Checkpoints --------
+
+    def save(self, path):
+        state = {
+            "config": self.config(),
+            "round": self.round,
+            "round_tables": self.round_tables,
+            "next_game": self.next_game,
+            "games_played": self.games_played,
+            "standings": {name: [s.rating, s.games, s.wins, s.place_total, s.byes]
+                          for name, s in self.standings.items()},
+            "met": [[a, b, count] for (a, b), count in self.met.items()],
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            state = json.load(f)
+        tournament = cls(**state["config"])
+        tournament.round = state["round"]
+        tournament.round_tables = state["round_tables"]
+        tournament.next_game = state["next_game"]
+        tournament.games_played = state["games_played"]
+        for name, values in state["standings"].items():
+            tournament.standings[name] = Standing(*values)
+        tournament.met = {(a, b): count for a, b, count in state["met"]}
+        return tournament
+
+# -------- Main --------
+
+def main():
+    parser = argparse.ArgumentParser(description="Rated tournaments between bot policies.")
+    parser.add_argument("--entrant", action="append", default=[], metavar="NAME=POLICY",
+                        help="random, passive, aggressive, mcts:ROLLOUTS or mcts:SECONDSs")
+    parser.add_argument("--seats", type=int, default=4)
+    parser.add_argument("--format", choices=("round-robin", "swiss"), default="round-robin")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--k-factor", type=float, default=16.0)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    parser.add_argument("--batch-size", type=int, default=100, help="games per worker task")
+    parser.add_argument("--checkpoint", metavar="PATH", help="save progress here; resume from it if present")
+    parser.add_argument("--checkpoint-every", type=float, default=30.0, metavar="SECONDS")
+    parser.add_argument("--max-games", type=int, help="stop after this many more games")
+    args = parser.parse_args()
+
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        tournament = Tournament.load(args.checkpoint)
+        print(f"Resuming {args.checkpoint} at round {tournament.round + 1}, "
+              f"{tournament.games_played} games played")
+    else:
+        entrants = dict(entrant.split("=", 1) for entrant in args.entrant)
+        tournament = Tournament(entrants, args.seats, args.format, args.rounds, args.seed,
+                                args.k_factor)
+    start = time.perf_counter()
+    played = tournament.games_played
+    board = tournament.run(args.workers or os.cpu_count(), args.batch_size, args.checkpoint,
+                           args.checkpoint_every, args.max_games)
+    elapsed = time.perf_counter() - start
+    played = tournament.games_played - played
+    print(f"{played} games in {elapsed:.1f}s ({played / elapsed if elapsed else 0:.0f} games/sec)")
+    print(f"{'entrant':16} {'rating':>8} {'games':>8} {'wins':>8} {'mean place':>11}")
+    for name, rating, games, wins, place in board:
+        print(f"{name:16} {rating:8.1f} {games:8} {wins:8} {place:11.2f}")
+
+if __name__ == "__main__":
+    main()